@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+"""Throughput and latency percentiles of the public client calls against the local fake DBL API.
+
+Run with ``python benchmarks/bench_client.py``. Results are written as JSON to stdout, or to the file
+given with ``--output``, so that runs of different releases can be compared.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import sys
+import time
+
+import aiohttp
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import dblapi  # noqa: E402
+from dblapi.client import Client  # noqa: E402
+
+import fake_dbl  # noqa: E402
+
+BOT_ID = 264811613708746752
+
+
+class FakeBot:
+    """Just enough of a discord.py bot for the client to start."""
+
+    class User:
+        id = BOT_ID
+
+    def __init__(self, loop):
+        self.loop = loop
+        self.user = self.User()
+        self.guilds = []
+        self.shard_id = None
+        self.shard_count = None
+
+    async def wait_until_ready(self):
+        pass
+
+    def is_closed(self):
+        return False
+
+    def dispatch(self, event, *args):
+        pass
+
+    def add_listener(self, func, name):
+        pass
+
+    def remove_listener(self, func, name):
+        pass
+
+
+def percentile(ordered: list, q: float) -> float:
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+
+async def measure(call, requests: int, concurrency: int) -> dict:
+    latencies = []
+    errors = 0
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one(i):
+        nonlocal errors
+        async with sem:
+            started = time.perf_counter()
+            try:
+                await call(i)
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "requests": requests, "concurrency": concurrency, "errors": errors, "seconds": elapsed,
+        "throughput": requests / elapsed, "p50": percentile(latencies, 0.50), "p90": percentile(latencies, 0.90),
+        "p99": percentile(latencies, 0.99), "max": latencies[-1] if latencies else 0.0
+    }
+
+
+async def main(args):
+    runner, base_url = await fake_dbl.start(total_bots=args.bots, **fake_dbl.app_options(args))
+    ttl = 300 if args.cached else 0
+    client = Client("token", FakeBot(asyncio.get_running_loop()), disable_stats=True, base_url=base_url,
+                    ratelimit=0, vote_refresh=0, cache_ttls={"bot": ttl, "stats": ttl, "search": ttl},
+                    circuit_breaker_threshold=0)
+    rng = random.Random(args.seed)
+    # About half of the checked users are in the fake vote list.
+    voters = [100000000000000000 + rng.randrange(args.votes * 2 or 1) for _ in range(1000)]
+    scenarios = {
+        "has_user_voted": lambda i: client.has_user_voted(voters[i % len(voters)]),
+        "get_bot": lambda i: client.get_bot(1 + rng.randrange(args.bots)),
+        "search_bots": lambda i: client.search_bots("bot", limit=args.search_limit,
+                                                    offset=rng.randrange(0, args.bots, args.search_limit)),
+        "post_stats": lambda i: client.post_stats(1000 + i)
+    }
+    results = {}
+    try:
+        await client._ready.wait()
+        for name, call in scenarios.items():
+            if args.only and name not in args.only:
+                continue
+            if args.warmup:
+                await measure(call, args.warmup, args.concurrency)
+            results[name] = await measure(call, args.requests, args.concurrency)
+    finally:
+        await client.close()
+        await runner.cleanup()
+    return {
+        "meta": {
+            "dblapi": dblapi.__version__, "aiohttp": aiohttp.__version__, "python": platform.python_version(),
+            "implementation": platform.python_implementation(), "platform": platform.platform(),
+            "timestamp": time.time(), "options": vars(args)
+        },
+        "results": results
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000, help="calls per scenario")
+    parser.add_argument("--concurrency", type=int, default=50, help="calls in flight at once")
+    parser.add_argument("--warmup", type=int, default=100, help="unmeasured calls before each scenario")
+    parser.add_argument("--bots", type=int, default=5000, help="number of bots get_bot and search_bots pick from")
+    parser.add_argument("--search-limit", type=int, default=50, help="bots per search_bots page")
+    parser.add_argument("--cached", action="store_true", help="enable the in-memory cache for bots and searches")
+    parser.add_argument("--only", nargs="*", help="scenarios to run, all by default")
+    parser.add_argument("--output", help="write the JSON results to this file instead of stdout")
+    fake_dbl.add_arguments(parser)
+    args = parser.parse_args()
+    report = json.dumps(asyncio.run(main(args)), indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report + "\n")
+    else:
+        print(report)
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""Import time of dblapi entry points, measured with ``python -X importtime``.
+
+Run with ``python benchmarks/bench_import.py``. Every statement runs in a fresh interpreter, ``--runs`` times,
+and the fastest run is reported together with the heavy packages it loaded, asyncio included,
+since short-lived scripts that only need the models should not pay for it.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+STATEMENTS = [
+    "import dblapi",
+    "from dblapi import DBLBot",
+    "from dblapi.request_lib import krequest",
+    "from dblapi import Client",
+]
+
+HEAVY = ("asyncio", "aiohttp", "discord", "diskcache", "dateutil")
+
+
+def import_time(statement: str) -> tuple:
+    """Returns the cumulative import time in microseconds of ``statement`` and the heavy packages it imported."""
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    # Timed against a bare interpreter, so that standard library modules a statement pulls in are counted.
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", statement], env=env, cwd=ROOT,
+                            stderr=subprocess.PIPE, universal_newlines=True, check=True)
+    total = 0
+    loaded = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not cumulative.strip().isdigit():
+            continue
+        package = name.strip().split(".")[0]
+        if package in HEAVY:
+            loaded.add(package)
+        # Top-level imports are not indented; their cumulative times add up to the total.
+        if not name[1:].startswith(" "):
+            total += int(cumulative)
+    return total, loaded
+
+
+def main(args):
+    baseline, _ = min(import_time("pass") for _ in range(args.runs))
+    results = {}
+    for statement in args.statements or STATEMENTS:
+        runs = [import_time(statement) for _ in range(args.runs)]
+        total, loaded = min(runs, key=lambda run: run[0])
+        results[statement] = {"microseconds": max(0, total - baseline), "loaded": sorted(loaded)}
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("statements", nargs="*", help="import statements to time, the dblapi entry points by default")
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per statement")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args()
+    results = main(args)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for statement, result in results.items():
+            print(f"{statement:42} {result['microseconds'] / 1000:8.1f} ms  {', '.join(result['loaded']) or '-'}")
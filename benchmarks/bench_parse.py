@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+"""Cost of parsing 10k bot payloads into :class:`dblapi.data_objects.DBLBot` objects.
+
+Run with ``python benchmarks/bench_parse.py``.
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import dateutil.parser  # noqa: E402
+
+from dblapi.data_objects import DBLBot, parse_date  # noqa: E402
+
+import fake_dbl  # noqa: E402
+
+BOTS = 10_000
+
+payloads = [fake_dbl.bot_payload(i) for i in range(1, BOTS + 1)]
+
+
+def parse():
+    return [DBLBot.parse(payload, None) for payload in payloads]
+
+
+def parse_and_touch():
+    for bot in parse():
+        bot.approved_date, bot.avatar, bot.link, bot.username_full
+
+
+def dates_dateutil():
+    for payload in payloads:
+        dateutil.parser.parse(payload["date"])
+
+
+def dates_fast():
+    for payload in payloads:
+        parse_date(payload["date"])
+
+
+if __name__ == "__main__":
+    for name, func in (("parse", parse), ("parse + lazy fields", parse_and_touch),
+                       ("dates via dateutil", dates_dateutil), ("dates via fromisoformat", dates_fast)):
+        best = min(timeit.repeat(func, number=1, repeat=5))
+        print(f"{name:24} {best * 1e3:8.2f} ms / {BOTS} bots")
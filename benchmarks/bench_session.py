@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""Requests/sec of a session-per-call client versus the pooled :class:`dblapi.request_lib.krequest`.
+
+Run with ``python benchmarks/bench_session.py``.
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+import aiohttp
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from dblapi.request_lib import krequest  # noqa: E402
+
+import fake_dbl  # noqa: E402
+
+REQUESTS = 2000
+CONCURRENCY = 20
+
+
+async def per_call_get(url):
+    # What krequest did before connections were pooled.
+    async with aiohttp.ClientSession(connector=aiohttp.TCPConnector()) as session:
+        async with session.get(url) as resp:
+            return await resp.json()
+
+
+async def run(fetch, url) -> float:
+    sem = asyncio.Semaphore(CONCURRENCY)
+
+    async def one():
+        async with sem:
+            await fetch(url)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(REQUESTS)))
+    return REQUESTS / (time.perf_counter() - start)
+
+
+async def main():
+    runner, base_url = await fake_dbl.start()
+    url = base_url + "bots/1/stats"
+    http = krequest()
+    try:
+        before = await run(per_call_get, url)
+        after = await run(http.get, url)
+    finally:
+        await http.close()
+        await runner.cleanup()
+    print(f"session per call: {before:8.1f} req/s")
+    print(f"pooled session:   {after:8.1f} req/s ({after / before:.1f}x)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
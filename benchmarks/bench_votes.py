@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+"""Vote lookup cost at 100k voters: list of ``str`` IDs versus the ``set`` of ``int`` IDs used by the vote cache.
+
+Run with ``python benchmarks/bench_votes.py``.
+"""
+
+import json
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from dblapi.decoders import decode_vote_ids, json_loads  # noqa: E402
+
+VOTERS = 100_000
+LOOKUPS = 1_000
+
+ids = random.sample(range(10 ** 17, 10 ** 18), VOTERS)
+as_list = [str(i) for i in ids]
+as_set = set(ids)
+body = json.dumps(as_list).encode()
+probes = [random.choice(ids) if n % 2 else random.randrange(10 ** 17, 10 ** 18) for n in range(LOOKUPS)]
+
+
+def list_lookup():
+    for user in probes:
+        str(user) in as_list
+
+
+def set_lookup():
+    for user in probes:
+        int(user) in as_set
+
+
+if __name__ == "__main__":
+    build = min(timeit.repeat(lambda: {int(u) for u in as_list}, number=1, repeat=5))
+    before = min(timeit.repeat(list_lookup, number=1, repeat=3)) / LOOKUPS
+    after = min(timeit.repeat(set_lookup, number=10, repeat=5)) / (LOOKUPS * 10)
+    stdlib = min(timeit.repeat(lambda: {int(u) for u in json.loads(body)}, number=1, repeat=5))
+    fastest = min(timeit.repeat(lambda: {int(u) for u in json_loads(body)}, number=1, repeat=5))
+    direct = min(timeit.repeat(lambda: decode_vote_ids(body), number=1, repeat=5))
+    print(f"decode via json.loads:      {stdlib * 1e3:8.2f} ms")
+    print(f"decode via {json_loads.__module__ + '.loads:':16}{fastest * 1e3:8.2f} ms")
+    print(f"decode_vote_ids:            {direct * 1e3:8.2f} ms")
+    print(f"build set once per refresh: {build * 1e3:8.2f} ms")
+    print(f"list[str] lookup:           {before * 1e6:8.2f} us")
+    print(f"set[int] lookup:            {after * 1e6:8.2f} us ({before / after:.0f}x)")
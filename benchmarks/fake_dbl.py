@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""Local stand-in for the DBL API, used by the benchmarks in this directory.
+
+Run with ``python benchmarks/fake_dbl.py --help`` to serve it on its own.
+"""
+
+import argparse
+import asyncio
+import random
+
+from aiohttp import web
+
+
+def bot_payload(bot_id: int, description_size: int = 0) -> dict:
+    return {
+        "id": str(bot_id), "username": f"Bot {bot_id}", "discriminator": "0001", "defAvatar": "", "avatar": "abcdef",
+        "lib": "discord.py", "prefix": "!", "shortdesc": "A bot.", "longdesc": "x" * description_size, "tags": ["Fun"],
+        "owners": ["1"], "date": "2018-03-18T17:57:12.000Z", "certifiedBot": False, "points": bot_id % 1000,
+        "vanity": None, "invite": "", "website": "", "github": "", "support": ""
+    }
+
+
+def make_app(total_bots: int = 5000, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+             votes: int = 100, description_size: int = 0, seed: int = 0) -> web.Application:
+    """
+    Every request waits ``latency`` plus up to ``jitter`` seconds, and fails with 503 at ``error_rate``.
+    Vote lists hold ``votes`` IDs, bot descriptions are ``description_size`` characters long.
+    """
+    rng = random.Random(seed)
+    vote_list = [str(100000000000000000 + i) for i in range(votes)]
+
+    @web.middleware
+    async def conditions(request, handler):
+        delay = latency + (rng.uniform(0, jitter) if jitter else 0.0)
+        if delay:
+            await asyncio.sleep(delay)
+        if error_rate and rng.random() < error_rate:
+            return web.json_response({"error": "Service Unavailable"}, status=503)
+        return await handler(request)
+
+    async def bot_search(request):
+        limit = min(int(request.query.get("limit", 50)), 500)
+        offset = int(request.query.get("offset", 0))
+        results = [bot_payload(i, description_size) for i in range(offset + 1, min(offset + limit, total_bots) + 1)]
+        return web.json_response({"results": results, "limit": limit, "offset": offset, "count": len(results),
+                                  "total": total_bots})
+
+    async def bot_get(request):
+        bot_id = int(request.match_info["bot_id"])
+        if not bot_id:
+            return web.json_response({"error": "Not found"}, status=404)
+        return web.json_response(bot_payload(bot_id, description_size))
+
+    async def bot_votes(request):
+        return web.json_response(vote_list)
+
+    async def bot_stats(request):
+        return web.json_response({"server_count": 100, "shard_count": 1, "shards": []})
+
+    async def bot_post_stats(request):
+        await request.json()
+        return web.json_response({})
+
+    app = web.Application(middlewares=[conditions])
+    app.router.add_get("/api/bots", bot_search)
+    app.router.add_get("/api/bots/{bot_id}", bot_get)
+    app.router.add_get("/api/bots/{bot_id}/votes", bot_votes)
+    app.router.add_get("/api/bots/{bot_id}/stats", bot_stats)
+    app.router.add_post("/api/bots/{bot_id}/stats", bot_post_stats)
+    return app
+
+
+async def start(host: str = "127.0.0.1", port: int = 0, **options):
+    """Starts the stand-in server and returns ``(runner, base_url)``. ``options`` are passed to :func:`make_app`."""
+    runner = web.AppRunner(make_app(**options), access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://{host}:{port}/api/"
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds every response is delayed")
+    parser.add_argument("--jitter", type=float, default=0.0, help="up to this many seconds of extra random delay")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 503")
+    parser.add_argument("--votes", type=int, default=100, help="number of IDs in the vote list")
+    parser.add_argument("--description-size", type=int, default=0, help="characters in every bot description")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the latency and error randomness")
+
+
+def app_options(args: argparse.Namespace) -> dict:
+    return {"latency": args.latency, "jitter": args.jitter, "error_rate": args.error_rate, "votes": args.votes,
+            "description_size": args.description_size, "seed": args.seed}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8080)
+    add_arguments(parser)
+    args = parser.parse_args()
+    web.run_app(make_app(**app_options(args)), port=args.port)
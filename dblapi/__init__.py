@@ -26,13 +26,44 @@ __license__ = 'MIT'
 __copyright__ = 'Copyright 2018 AndyTempel'
 __version__ = '0.1.4b'
 
+import importlib
 import logging
 from collections import namedtuple
 
-from .client import Client
-from .data_objects import *
 from .errors import *
 
+# Imported on first access, so that importing dblapi does not load the HTTP client and its dependencies.
+_LAZY = {
+    "Client": ".client",
+    "Avatar": ".data_objects",
+    "DBLBot": ".data_objects",
+    "DBLStats": ".data_objects",
+    "Description": ".data_objects",
+    "parse_date": ".data_objects",
+    "VALID_AVATAR_FORMATS": ".data_objects",
+    "VALID_STATIC_FORMATS": ".data_objects",
+    "deadline": ".timeouts",
+    "DeadlineExceeded": ".timeouts",
+}
+
+__all__ = ["RequireFormatting", "WeirdResponse", "InvalidArgument", "RateLimited", "HTTPException", "CircuitOpen",
+           *_LAZY]
+
+
+def __getattr__(name):
+    try:
+        module = _LAZY[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY))
+
+
 VersionInfo = namedtuple('VersionInfo', 'major minor micro releaselevel serial')
 
 version_info = VersionInfo(major=0, minor=1, micro=4, releaselevel='beta', serial=0)
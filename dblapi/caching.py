@@ -17,69 +17,337 @@
 # LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
 # FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
 # DEALINGS IN THE SOFTWARE.
+import asyncio
 import datetime
+import logging
+import time
+from collections import OrderedDict
+
+from .timeouts import clear_deadline
+
+log = logging.getLogger(__name__)
+
+_MISSING = object()
 
 
 class Cacher:
-    def __init__(self, client, update_function, store_for: int = 10, is_dict: bool = True, **kwargs):
+    """
+    Keeps the result of ``update_function`` for ``store_for`` seconds.
+
+    Concurrent callers that find the store expired share a single in-flight refresh. With
+    ``stale_while_revalidate`` enabled, an expired store that was filled before is returned right
+    away while the refresh runs in a background task.
+
+    If ``persistent`` (a :class:`diskcache.Cache`) is given, the store is also written there under
+    ``key`` with the same lifetime, and a refresh reads it before calling ``update_function``. ``key``
+    can be a callable taking the client, for keys that are only known once the client is ready.
+    Values added with :meth:`insert` are written at most once every ``persist_delay`` seconds.
+
+    ``store`` replaces the initial empty store. If ``merge`` is given, refreshed data is merged into the
+    current store with ``merge(store, data)`` instead of replacing it.
+
+    Hits, misses and refreshes are counted under ``name`` in ``metrics`` (a :class:`dblapi.metrics.Metrics`).
+    """
+
+    def __init__(self, client, update_function, store_for: int = 10, is_dict: bool = True, is_set: bool = False,
+                 stale_while_revalidate: bool = False, persistent=None, key=None, store=None, merge=None,
+                 metrics=None, name: str = "cacher", persist_delay: float = 5.0, **kwargs):
         self.client = client
-        self.store = {} if is_dict else []
+        self.is_set = is_set
+        if store is None:
+            store = set() if is_set else {} if is_dict else []
+        self.store = store
+        self.merge = merge
         self.store_for = datetime.timedelta(seconds=store_for)
         self.expiry = datetime.datetime.utcnow()
+        self.stale_while_revalidate = stale_while_revalidate
         self.kwargs = kwargs
+        self.metrics = metrics
+        self.name = name
+
+        self.persistent = persistent
+        self.key = key
+        self.persist_delay = persist_delay
+        self._persist_handle = None
+        # Expiry timestamp of this instance's last write, to tell its own entry from those of other processes.
+        self._written_until = None
 
         self.update_cache = update_function
+        self._primed = False
+        self._refreshing = None
 
     def set_expiry(self):
         self.expiry = datetime.datetime.utcnow() + self.store_for
 
     @property
-    async def get(self):
-        if datetime.datetime.utcnow() > self.expiry:
-            self.store.clear()
-            self.store = await self.update_cache(self.client, self.kwargs)
+    def expired(self) -> bool:
+        return datetime.datetime.utcnow() > self.expiry
+
+    @property
+    def persistent_key(self):
+        return self.key(self.client) if callable(self.key) else self.key
+
+    def load_persistent(self, min_ttl: datetime.timedelta = datetime.timedelta(0), newer_than: float = None) -> bool:
+        """
+        Fills the store from the persistent tier if it has an entry that lives at least ``min_ttl`` longer and, if
+        ``newer_than`` is given, expires after that timestamp. Returns True if the store was filled.
+        """
+        if self.persistent is None:
+            return False
+        value, expire_time = self.persistent.get(self.persistent_key, expire_time=True)
+        if value is None:
+            return False
+        if newer_than is not None and (expire_time is None or expire_time <= newer_than):
+            return False
+        if expire_time is None:
+            expiry = datetime.datetime.utcnow() + self.store_for
+        else:
+            expiry = datetime.datetime.utcfromtimestamp(expire_time)
+        if expiry - datetime.datetime.utcnow() < min_ttl:
+            return False
+        self.store = value
+        self.expiry = expiry
+        self._primed = True
+        return True
+
+    def refresh(self) -> asyncio.Future:
+        """Starts a refresh unless one is already in flight. Returns the future of the in-flight refresh."""
+        if self._refreshing is None:
+            self._refreshing = self.client.loop.create_task(self._do_refresh())
+            self._refreshing.add_done_callback(self._refresh_done)
+        return self._refreshing
+
+    async def _do_refresh(self):
+        clear_deadline()
+        # Inserted values would be lost if the store was replaced from the persistent tier.
+        self.flush()
+        try:
+            # Another process sharing the persistent tier may have refreshed since this one last wrote.
+            if self.load_persistent(min_ttl=self.store_for / 2, newer_than=self._written_until):
+                if self.metrics is not None:
+                    self.metrics.cache_event(self.name, "persistent_hits")
+                return self.store
+            if self.metrics is not None:
+                self.metrics.cache_event(self.name, "refreshes")
+            data = await self.update_cache(self.client, **self.kwargs)
+            self.store = self.merge(self.store, data) if self.merge is not None else data
             self.set_expiry()
+            self._primed = True
+            if self.persistent is not None:
+                self._cancel_persist()
+                self._persist(self.store_for.total_seconds())
+            return self.store
+        finally:
+            self._refreshing = None
+
+    async def close(self):
+        """|coro|
+
+        Cancels the in-flight refresh, if any, and waits for it to finish.
+        """
+        task = self._refreshing
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    @staticmethod
+    def _refresh_done(task):
+        if not task.cancelled() and task.exception() is not None:
+            log.error("Cache refresh failed: %r", task.exception())
+
+    async def _fresh(self):
+        expired = self.expired
+        if self.metrics is not None:
+            self.metrics.cache_event(self.name, "misses" if expired else "hits")
+        if expired:
+            refresh = self.refresh()
+            if not (self.stale_while_revalidate and self._primed):
+                # Shielded so that a cancelled caller does not cancel the refresh other callers wait on.
+                await asyncio.shield(refresh)
         return self.store
 
+    @property
+    async def get(self):
+        return await self._fresh()
+
     def __set__(self, instance, value):
         self.store.clear()
         self.store = value
         self.set_expiry()
 
     async def get_val(self, key):
-        if datetime.datetime.utcnow() > self.expiry:
-            self.store.clear()
-            self.store = await self.update_cache(self.client, self.kwargs)
-            self.set_expiry()
+        await self._fresh()
         return self.store[key]
 
     async def remove_val(self, key):
-        if datetime.datetime.utcnow() > self.expiry:
-            self.store.clear()
-            self.store = await self.update_cache(self.client, self.kwargs)
-            self.set_expiry()
+        await self._fresh()
         del self.store[key]
 
     async def append(self, value):
-        if datetime.datetime.utcnow() > self.expiry:
-            self.store.clear()
-            self.store = await self.update_cache(self.client, self.kwargs)
-            self.set_expiry()
-        self.store.append(value)
+        await self._fresh()
+        if self.is_set:
+            self.store.add(value)
+        else:
+            self.store.append(value)
 
     async def update(self, key, value):
-        if datetime.datetime.utcnow() > self.expiry:
-            self.store.clear()
-            self.store = await self.update_cache(self.client, self.kwargs)
-            self.set_expiry()
+        await self._fresh()
         self.store.update({key: value})
 
+    def insert(self, value):
+        """
+        Adds a value to the current store without refreshing it. The store is written through to the
+        persistent tier ``persist_delay`` seconds later, together with anything inserted in the meantime.
+        """
+        if self.is_set:
+            self.store.add(value)
+        else:
+            self.store.append(value)
+        if self.persistent is not None and self._primed and self._persist_handle is None:
+            self._persist_handle = self.client.loop.call_later(self.persist_delay, self.flush)
+
+    def _cancel_persist(self) -> bool:
+        if self._persist_handle is None:
+            return False
+        self._persist_handle.cancel()
+        self._persist_handle = None
+        return True
+
+    def flush(self):
+        """Writes inserted values through to the persistent tier now, with the store's remaining lifetime."""
+        if self._cancel_persist() and not self.expired:
+            self._persist((self.expiry - datetime.datetime.utcnow()).total_seconds())
+
+    def _persist(self, expire: float):
+        self.persistent.set(self.persistent_key, self.store, expire=expire)
+        # Taken after the write, so that it is not earlier than the expiry diskcache stored.
+        self._written_until = time.time() + expire
+
     async def is_in(self, key):
-        if datetime.datetime.utcnow() > self.expiry:
-            self.store.clear()
-            self.store = await self.update_cache(self.client, self.kwargs)
-            self.set_expiry()
+        await self._fresh()
         if key in self.store:
             return True
         else:
             return False
+
+
+class LRUCache:
+    """
+    Bounded least-recently-used cache whose entries expire ``ttl`` seconds after they were stored.
+
+    :meth:`get_or_fetch` runs at most one fetch per key at a time; concurrent callers for the same key
+    wait on the same fetch. Hit, miss, eviction and coalesced-wait counters are available from :attr:`stats`,
+    and are also counted under ``name`` in ``metrics`` if given.
+    """
+
+    def __init__(self, maxsize: int = 1024, metrics=None, name: str = "lru"):
+        self.maxsize = maxsize
+        self.metrics = metrics
+        self.name = name
+        self._store = OrderedDict()
+        self._inflight = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.coalesced = 0
+
+    def __len__(self):
+        return len(self._store)
+
+    def __contains__(self, key):
+        return self._lookup(key) is not _MISSING
+
+    def _lookup(self, key):
+        try:
+            expires, value = self._store[key]
+        except KeyError:
+            return _MISSING
+        if time.monotonic() > expires:
+            del self._store[key]
+            return _MISSING
+        self._store.move_to_end(key)
+        return value
+
+    def get(self, key, default=None):
+        value = self._lookup(key)
+        if value is _MISSING:
+            self._count("misses")
+            return default
+        self._count("hits")
+        return value
+
+    def set(self, key, value, ttl: float):
+        self._store[key] = (time.monotonic() + ttl, value)
+        self._store.move_to_end(key)
+        while len(self._store) > self.maxsize:
+            self._store.popitem(last=False)
+            self._count("evictions")
+
+    def invalidate(self, key):
+        self._store.pop(key, None)
+
+    def clear(self):
+        self._store.clear()
+
+    def _count(self, event: str):
+        setattr(self, event, getattr(self, event) + 1)
+        if self.metrics is not None:
+            self.metrics.cache_event(self.name, event)
+
+    async def get_or_fetch(self, key, fetch, ttl: float):
+        """|coro|
+
+        Returns the cached value for ``key``, or awaits ``fetch()`` and caches its result for ``ttl`` seconds.
+        """
+        value = self._lookup(key)
+        if value is not _MISSING:
+            self._count("hits")
+            return value
+        task = self._inflight.get(key)
+        if task is None:
+            self._count("misses")
+            task = asyncio.ensure_future(self._fetch(key, fetch, ttl))
+            task.add_done_callback(self._fetch_done)
+            self._inflight[key] = task
+        else:
+            self._count("coalesced")
+        # Shielded so that a cancelled caller does not cancel the fetch other callers wait on.
+        return await asyncio.shield(task)
+
+    async def _fetch(self, key, fetch, ttl):
+        clear_deadline()
+        try:
+            value = await fetch()
+            self.set(key, value, ttl)
+            return value
+        finally:
+            del self._inflight[key]
+
+    async def close(self):
+        """|coro|
+
+        Cancels the in-flight fetches and waits for them to finish. Callers waiting on them get
+        :class:`asyncio.CancelledError`.
+        """
+        tasks = list(self._inflight.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    @staticmethod
+    def _fetch_done(task):
+        # Marks the exception as retrieved when every caller has been cancelled; callers still see it.
+        if not task.cancelled():
+            task.exception()
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "size": len(self._store),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "coalesced": self.coalesced,
+            "inflight": len(self._inflight)
+        }
@@ -19,18 +19,26 @@
 # DEALINGS IN THE SOFTWARE.
 
 import asyncio
+import datetime
 import logging
+import os
+import random
 import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
-import discord
-from discord.ext.commands import Bot, AutoShardedBot
-from diskcache import Cache
-
-from .caching import Cacher
+from .caching import Cacher, LRUCache
+from .cluster import ClusterStats
+from .ratelimit import RateLimiter
+from .retry import RETRY_STATUSES, CircuitBreaker, RetryPolicy
 from .data_objects import *
+from .decoders import JSONArrayParser
+from .metrics import Metrics
 from .helpers import *
 from .request_lib import krequest
 from .router import Router
+from .timeouts import wait
+from .votes import VoteStore
 
 BASE_URL = "https://discordbots.org/api/"
 log = logging.getLogger(__name__)
@@ -42,9 +50,11 @@ class Client:
     .. _aiohttp session: https://aiohttp.readthedocs.io/en/stable/client_reference.html#client-session
 
 
-    Represents a client connection that connects to DBL API. It works in two modes:
+    Represents a client connection that connects to DBL API. It works in three modes:
         1. As a standalone variable.
         2. Plugged-in to discord.py Bot or AutoShardedBot, see `Client.pluggable`
+        3. Without a bot, e.g. in worker processes with no gateway connection. Pass ``bot_id`` instead of
+           ``bot``; votes are served right away and statistics are only posted through :meth:`post_stats`.
 
     This class is used to interact with DBL API.
 
@@ -53,8 +63,8 @@ class Client:
     -------------
     api_key: :class:`str`
         Your DBL bot token.
-    bot: Bot or AutoShardedBot
-        Your bot client from discord.py
+    bot: Bot or AutoShardedBot[Optional]
+        Your bot client from discord.py. Required unless ``bot_id`` is given.
     disable_stats: bool[Optional]
         *Not required*
         Disable sending statistics from your bot to DBL.
@@ -63,54 +73,440 @@ class Client:
         *Not required*
         Enable SSL certificate verification.
         **Default:** True
+    **bot_id: int[Optional]
+        *Not required*
+        ID of your bot. Given, the client does not wait for ``bot`` to be ready before checking votes.
+        Required without ``bot``.
+    **loop: asyncio.AbstractEventLoop[Optional]
+        *Not required*
+        Event loop of the background tasks. Defaults to the bot's loop, or the current event loop without a bot.
     **base_url: str[Optional]
         *Not required*
         Specify different DBL API url.
     **vote_days: int[Optional]
         *Not required*
         Specify how many days to look up votes. Defaults to 31.
+    **vote_refresh: int[Optional]
+        *Not required*
+        Refresh the vote list in the background roughly every this many seconds, so that vote checks
+        do not wait on DBL. Set to 0 to only refresh when a vote check finds the list expired.
+        Defaults to 60, or 900 if the vote webhook is enabled.
+    **stale_while_revalidate: bool[Optional]
+        *Not required*
+        Answer vote checks from the expired vote list while it is refreshed in the background,
+        instead of waiting for the refresh. Defaults to True if ``vote_refresh`` is enabled.
+    **webhook_port: int[Optional]
+        *Not required*
+        Start a vote webhook server on this port. Votes received through it are added to the vote list
+        right away and dispatched to your bot as the ``on_dbl_vote(data)`` event. Disabled by default.
+    **webhook_auth: str[Optional]
+        *Required with* ``webhook_port``
+        Authorization you set for the webhook on DBL. Requests with a different ``Authorization`` header
+        are rejected, so that nobody else can add votes.
+    **webhook_path: str[Optional]
+        *Not required*
+        URL path of the webhook. Defaults to ``/dblwebhook``.
+    **webhook_host: str[Optional]
+        *Not required*
+        Interface the webhook server binds to. Defaults to ``0.0.0.0``.
+    **stats_threshold: int[Optional]
+        *Not required*
+        Post statistics as soon as the server count changed by at least this much. Smaller changes are posted
+        after ``stats_interval``, and nothing is posted while the count does not change. Defaults to 1.
+    **stats_interval: int[Optional]
+        *Not required*
+        Seconds after which a change below ``stats_threshold`` is posted anyway. Defaults to 1800.
+    **stats_min_interval: int[Optional]
+        *Not required*
+        Seconds between checks of the server count, and so the shortest time between two posts. Failed posts
+        are retried with a growing delay starting here. Defaults to 60.
+    **cluster_dir: str[Optional]
+        *Not required*
+        Directory shared by all processes of a bot cluster. Each process publishes its shards' guild counts
+        there and only one elected process posts statistics for the whole cluster. Disabled by default.
+    **cluster_id: str[Optional]
+        *Not required*
+        Unique, stable name of this process within the cluster. Defaults to the lowest shard ID it runs.
+    **cluster_mode: str[Optional]
+        *Not required*
+        ``"shards"`` posts a per-shard ``shards`` list once every shard has been published, ``"total"`` always
+        posts the cluster's total server count. Defaults to ``"shards"``.
+    **cache_dir: str or bool[Optional]
+        *Not required*
+        Directory of a persistent on-disk cache for votes, bots and statistics. It survives restarts and
+        is shared by all processes using the same directory. ``True`` uses a directory in the system
+        temporary directory. Disabled by default.
+    **cache_size: int[Optional]
+        *Not required*
+        Maximum number of bots, bot statistics and search results kept in memory. Defaults to 1024.
+    **cache_ttls: dict[Optional]
+        *Not required*
+        Seconds results are cached for, per endpoint: ``"bot"``, ``"stats"`` and ``"search"``.
+        Defaults to ``{"bot": 300, "stats": 60, "search": 60}``. Setting an endpoint to 0 disables its cache.
+    **ratelimit: int[Optional]
+        *Not required*
+        Requests per minute allowed on each API route. Requests over the limit, or answered with 429,
+        wait for their turn instead of failing. Set to 0 to disable the client-side limiter. Defaults to 60.
+    **retries: int[Optional]
+        *Not required*
+        Maximum attempts for a request that fails with a server error or a connection problem. Defaults to 3.
+    **retry_backoff: float[Optional]
+        *Not required*
+        Base delay in seconds between attempts, doubled on every retry and randomised. Defaults to 0.5.
+    **retry_statuses: set[Optional]
+        *Not required*
+        HTTP statuses that are retried. Defaults to 500, 502, 503, 504, 520, 522 and 524.
+    **circuit_breaker_threshold: int[Optional]
+        *Not required*
+        Consecutive failures after which requests fail fast with :class:`dblapi.errors.CircuitOpen`.
+        Set to 0 to disable the circuit breaker. Defaults to 5.
+    **circuit_breaker_timeout: float[Optional]
+        *Not required*
+        Seconds requests fail fast before a trial request is let through. Defaults to 30.
+    **json_loads: callable[Optional]
+        *Not required*
+        Function decoding JSON response bodies from :class:`bytes`. Defaults to ``orjson.loads`` or
+        ``ujson.loads`` if installed, :func:`json.loads` otherwise.
+    **stream_responses: bool[Optional]
+        *Not required*
+        Read the vote list in chunks and parse it as it arrives, instead of buffering and decoding it in one go.
+        Keeps memory flat and the event loop responsive for bots with many votes. Defaults to False.
+    **stream_slice: float[Optional]
+        *Not required*
+        Seconds streamed parsing may hold the event loop before handing control back. Defaults to 0.005.
+    **executor: str or concurrent.futures.Executor[Optional]
+        *Not required*
+        Decode large responses, and parse large search pages, off the event loop. ``"thread"`` or ``"process"``
+        creates a pool owned by the client; an existing executor can be passed as well. With a process pool
+        only decoding is offloaded. Disabled by default.
+    **executor_workers: int[Optional]
+        *Not required*
+        Number of workers of a pool created by the client. Defaults to the executor's own default.
+    **offload_threshold: int[Optional]
+        *Not required*
+        Responses of at least this many bytes are decoded in the executor. Defaults to 262144 (256 KiB).
+    **offload_items: int[Optional]
+        *Not required*
+        Search pages with at least this many bots are parsed in a thread executor. Defaults to 100.
+    **pool_limit: int[Optional]
+        *Not required*
+        Maximum number of simultaneous connections in the shared connection pool. Defaults to 100.
+    **pool_limit_per_host: int[Optional]
+        *Not required*
+        Maximum number of simultaneous connections to DBL. Defaults to 20.
+    **keepalive_timeout: float[Optional]
+        *Not required*
+        Seconds an idle pooled connection is kept open for reuse. Defaults to 30.
+    **dns_cache_ttl: int[Optional]
+        *Not required*
+        Seconds resolved DBL addresses are cached for. Defaults to 300.
+    **timeout: float or aiohttp.ClientTimeout[Optional]
+        *Not required*
+        Default timeout of every request attempt. Defaults to 30 seconds in total and 10 to connect.
+    **metrics: bool[Optional]
+        *Not required*
+        Collect per-route latency histograms, status, retry and byte counters, in-flight gauges and cache
+        counters in :attr:`metrics`. Defaults to True.
+    **on_request_start: callable[Optional]
+        *Not required*
+        Called as ``on_request_start(route, method, url)`` before every HTTP request. Requires ``metrics``.
+    **on_request_end: callable[Optional]
+        *Not required*
+        Called as ``on_request_end(route, method, url, status, elapsed, error)`` after every HTTP request.
+        Requires ``metrics``.
+
+    .. note::
+        HTTP connections are pooled and reused between calls. Call :meth:`close` (or use the client
+        as an ``async with`` context manager) when you are done with it.
 
     """
 
-    def __init__(self, api_key: str, bot: Bot or AutoShardedBot, disable_stats: bool = False, ssl_verify: bool = True,
-                 **kwargs):
+    def __init__(self, api_key: str, bot: "Bot or AutoShardedBot" = None, disable_stats: bool = False,
+                 ssl_verify: bool = True, **kwargs):
+        if kwargs.get("webhook_port") and not kwargs.get("webhook_auth"):
+            raise InvalidArgument("webhook_auth is required with webhook_port")
         self.api_key = api_key
+        self.ssl_verify = ssl_verify
+        self.metrics = Metrics() if kwargs.pop("metrics", True) else None
+        for hook in ("on_request_start", "on_request_end"):
+            callback = kwargs.pop(hook, None)
+            if callback is not None and self.metrics is not None:
+                getattr(self.metrics, hook).append(callback)
+        ratelimit = kwargs.pop("ratelimit", 60)
+        executor = kwargs.pop("executor", None)
+        self._owns_executor = isinstance(executor, str)
+        if executor == "thread":
+            executor = ThreadPoolExecutor(kwargs.pop("executor_workers", None), thread_name_prefix="dblapi")
+        elif executor == "process":
+            executor = ProcessPoolExecutor(kwargs.pop("executor_workers", None))
+        elif isinstance(executor, str):
+            raise InvalidArgument("executor must be \"thread\", \"process\" or an Executor")
+        self.offload_items = kwargs.pop("offload_items", 100)
+        retry = RetryPolicy(kwargs.pop("retries", 3), kwargs.pop("retry_backoff", 0.5),
+                            statuses=kwargs.pop("retry_statuses", RETRY_STATUSES))
+        breaker_threshold = kwargs.pop("circuit_breaker_threshold", 5)
+        breaker = CircuitBreaker(breaker_threshold, kwargs.pop("circuit_breaker_timeout", 30.0)) \
+            if breaker_threshold else None
         self.http = krequest(global_headers=[
             ("Authorization", self.api_key)
-        ])
+        ], limit=kwargs.pop("pool_limit", 100), limit_per_host=kwargs.pop("pool_limit_per_host", 20),
+            keepalive_timeout=kwargs.pop("keepalive_timeout", 30.0), ttl_dns_cache=kwargs.pop("dns_cache_ttl", 300),
+            verify=self.ssl_verify, ratelimiter=RateLimiter(ratelimit, 60.0) if ratelimit else None, retry=retry,
+            breaker=breaker, json_loads=kwargs.pop("json_loads", None), executor=executor,
+            offload_threshold=kwargs.pop("offload_threshold", 262144), metrics=self.metrics,
+            timeout=kwargs.pop("timeout", None))
         self.router = Router(kwargs.pop("base_url", BASE_URL))
-        self.ssl_verify = ssl_verify
+        self.stream_responses = kwargs.pop("stream_responses", False)
+        self.stream_slice = kwargs.pop("stream_slice", 0.005)
 
         self.bot = bot
-        self.bot_id = None
-        self.loop = kwargs.pop("loop", self.bot.loop)
-        self.loop.create_task(self.__get_info())
-        if not disable_stats:
-            self.loop.create_task(self.__update_bot_stats())
-
-        # self.cache = Cache(tempfile.gettempdir())
-        self.voting_cache = Cacher(self, update_vote_cache, is_dict=False, days=kwargs.get("vote_days", 31))
+        self.bot_id = kwargs.pop("bot_id", None)
+        if self.bot is None and self.bot_id is None:
+            raise InvalidArgument("bot_id is required without a bot")
+        self.loop = kwargs.pop("loop", None) or (bot.loop if bot is not None else asyncio.get_event_loop())
+        self._ready = asyncio.Event()
+        cluster_dir = kwargs.pop("cluster_dir", None)
+        self.cluster = None
+        if cluster_dir:
+            cluster_id = kwargs.pop("cluster_id", None)
+            if cluster_id is None:
+                cluster_id = min(getattr(self.bot, "shard_ids", None) or [getattr(self.bot, "shard_id", None) or 0])
+            self.cluster = ClusterStats(cluster_dir, cluster_id)
+        self.cluster_mode = kwargs.pop("cluster_mode", "shards")
+        self.stats_threshold = kwargs.pop("stats_threshold", 1)
+        self.stats_interval = kwargs.pop("stats_interval", 1800)
+        self.stats_min_interval = kwargs.pop("stats_min_interval", 60)
+        self._guild_counts = {}
+        self._tasks = []
+        if self.bot_id is None:
+            self._tasks.append(self.loop.create_task(self.__get_info()))
+        if not disable_stats and self.bot is not None:
+            self._tasks.append(self.loop.create_task(self.__update_bot_stats()))
+
+        cache_dir = kwargs.pop("cache_dir", None)
+        if cache_dir is True:
+            cache_dir = os.path.join(tempfile.gettempdir(), "dblapi")
+        self.cache = None
+        if cache_dir:
+            from diskcache import Cache
+            self.cache = Cache(cache_dir)
+        self.api_cache = LRUCache(kwargs.pop("cache_size", 1024), self.metrics, "api")
+        self.cache_ttls = {"bot": 300, "stats": 60, "search": 60}
+        self.cache_ttls.update(kwargs.pop("cache_ttls", {}))
+
+        webhook_port = kwargs.pop("webhook_port", None)
+        self.webhook = None
+        if webhook_port:
+            from .webhook import WebhookServer
+            self.webhook = WebhookServer(self._on_vote, kwargs.pop("webhook_path", "/dblwebhook"),
+                                         kwargs.pop("webhook_auth", None), kwargs.pop("webhook_host", "0.0.0.0"),
+                                         webhook_port)
+            task = self.loop.create_task(self.webhook.start())
+            task.add_done_callback(self._webhook_started)
+            self._tasks.append(task)
+
+        # With webhooks delivering votes, polling only reconciles missed ones.
+        self.vote_refresh = kwargs.pop("vote_refresh", 900 if self.webhook else 60)
+        vote_days = kwargs.get("vote_days", 31)
+        self.voting_cache = Cacher(self, update_vote_cache, store_for=self.vote_refresh * 2 or 10, is_set=True,
+                                   stale_while_revalidate=kwargs.pop("stale_while_revalidate", bool(self.vote_refresh)),
+                                   persistent=self.cache, key=lambda client: f"votes:{client.bot_id}:{vote_days}",
+                                   store=VoteStore(vote_days * 86400), merge=VoteStore.reconcile, metrics=self.metrics,
+                                   name="votes", days=vote_days)
+        if self.bot_id is not None:
+            self.bot_id = int(self.bot_id)
+            self.voting_cache.load_persistent()
+            self._ready.set()
+        if self.vote_refresh:
+            self._tasks.append(self.loop.create_task(self.__refresh_votes()))
 
     async def __get_info(self):
         await self.bot.wait_until_ready()
         self.bot_id = self.bot.user.id
         log.debug("Got Bot user ID: " + str(self.bot_id))
+        self.voting_cache.load_persistent()
+        self._ready.set()
         # log.info("Connecting to DBL and gathering information ...")
 
+    async def __refresh_votes(self):
+        await self._ready.wait()
+        failures = 0
+        while True:
+            try:
+                await self.voting_cache.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                failures += 1
+                # Exponential backoff, capped at the regular interval.
+                delay = min(self.vote_refresh, 2 ** failures) * random.uniform(0.5, 1.0)
+                log.warning(f"Refreshing votes failed ({e!r}), retrying in {delay:.1f}s")
+            else:
+                failures = 0
+                # Jitter ahead of the interval so multiple processes do not refresh in lockstep.
+                delay = self.vote_refresh * random.uniform(0.8, 1.0)
+            await asyncio.sleep(delay)
+
     async def __update_bot_stats(self):
         await self.bot.wait_until_ready()
+        # Counted once here, then kept up to date from guild events.
+        self._guild_counts = self._shard_counts()
+        self.bot.add_listener(self._on_guild_join, "on_guild_join")
+        self.bot.add_listener(self._on_guild_remove, "on_guild_remove")
+        last_posted, last_total, last_post = None, None, float("-inf")
+        failures = 0
         while not self.bot.is_closed():
-            log.info("Posting bot statistics to DBL ...")
+            delay = self.stats_min_interval
             try:
-                data = {"server_count": len(self.bot.guilds)}
-                if isinstance(self.bot, AutoShardedBot):
-                    data.update({"shard_count": self.bot.shard_count, "shard_id": self.bot.shard_id})
-                r = await self.http.post(self.router.bot_ul_stats.format_url(self.bot_id), json=data)
-                log.debug(r)
+                if time.monotonic() - last_post >= self.stats_interval:
+                    # Corrects drift from missed events once per interval.
+                    self._guild_counts = self._shard_counts()
+                data = self._stats_data()
+                if data is not None:
+                    total = data["server_count"] if "server_count" in data else sum(data["shards"])
+                    due = last_total is None or abs(total - last_total) >= self.stats_threshold or \
+                        time.monotonic() - last_post >= self.stats_interval
+                    if data != last_posted and due:
+                        await self._post_stats(data)
+                        last_posted, last_total, last_post = data, total, time.monotonic()
+                failures = 0
             except Exception as e:
-                log.error(e)
-            finally:
-                await asyncio.sleep(300)
+                failures += 1
+                delay = min(self.stats_interval, self.stats_min_interval * 2 ** failures) * random.uniform(0.5, 1.0)
+                log.error(f"Posting bot statistics failed ({e!r}), retrying in {delay:.0f}s")
+            await asyncio.sleep(delay)
+
+    async def _post_stats(self, data: dict):
+        log.info("Posting bot statistics to DBL ...")
+        r = await self.http.post(self.router.bot_ul_stats(self.bot_id), json=data,
+                                 bucket=self.router.bot_ul_stats.bucket)
+        log.debug(r)
+        if isinstance(r, dict) and "error" in r:
+            # E.g. a 401 for a bad token; raised so that the post is retried and the error logged.
+            raise WeirdResponse(f"DBL rejected the statistics: {r['error']}")
+        return r
+
+    async def _on_guild_join(self, guild):
+        shard_id = guild.shard_id or 0
+        self._guild_counts[shard_id] = self._guild_counts.get(shard_id, 0) + 1
+
+    async def _on_guild_remove(self, guild):
+        shard_id = guild.shard_id or 0
+        self._guild_counts[shard_id] = max(0, self._guild_counts.get(shard_id, 0) - 1)
+
+    def _stats_data(self) -> dict:
+        """Statistics to post, or None if another process of the cluster posts them."""
+        if self.cluster is not None:
+            self.cluster.publish(self._guild_counts, self.bot.shard_count or 1)
+            if not self.cluster.is_leader():
+                log.debug("Not the cluster leader, leaving posting statistics to it")
+                return None
+            shards, shard_count = self.cluster.collect()
+            if self.cluster_mode == "shards" and None not in shards:
+                return {"shards": shards, "shard_count": shard_count}
+            return {"server_count": sum(count for count in shards if count), "shard_count": shard_count}
+        data = {"server_count": sum(self._guild_counts.values())}
+        if self._sharded:
+            data.update({"shard_count": self.bot.shard_count, "shard_id": self.bot.shard_id})
+        return data
+
+    @property
+    def _sharded(self) -> bool:
+        # Duck-typed check for AutoShardedBot, so that importing the client does not import discord.py.
+        return hasattr(self.bot, "shards")
+
+    def _shard_counts(self) -> dict:
+        if not self._sharded:
+            return {self.bot.shard_id or 0: len(self.bot.guilds)}
+        counts = dict.fromkeys(self.bot.shard_ids or range(self.bot.shard_count or 1), 0)
+        for guild in self.bot.guilds:
+            counts[guild.shard_id] = counts.get(guild.shard_id, 0) + 1
+        return counts
+
+    async def _cached_get(self, endpoint: str, url: str, params: dict = None, parse=None, bucket: str = None):
+        ttl = self.cache_ttls.get(endpoint, 0)
+        key = f"GET {url} {sorted(params.items()) if params else ''}"
+
+        async def fetch():
+            r = None
+            if self.cache is not None and ttl:
+                r = self.cache.get(key)
+                if self.metrics is not None:
+                    self.metrics.cache_event("disk", "misses" if r is None else "hits")
+            if r is None:
+                r = await self.http.get(url, params=params, bucket=bucket)
+                if self.cache is not None and ttl and r and not (isinstance(r, dict) and "error" in r):
+                    self.cache.set(key, r, expire=ttl)
+            if parse is None:
+                return r
+            size = len(r.get("results", ())) if isinstance(r, dict) else 0
+            return await self.http.offload(parse, r, size, threshold=self.offload_items, thread_only=True)
+
+        if not ttl:
+            return await fetch()
+        return await self.api_cache.get_or_fetch(key, fetch, ttl)
+
+    @staticmethod
+    def _webhook_started(task):
+        if not task.cancelled() and task.exception() is not None:
+            log.error(f"Starting the vote webhook server failed: {task.exception()!r}")
+
+    def _on_vote(self, data: dict):
+        log.debug(f"Received vote webhook: {data}")
+        if data.get("type", "upvote") == "upvote":
+            self.voting_cache.insert(int(data["user"]))
+        if self.bot is not None:
+            self.bot.dispatch("dbl_vote", data)
+
+    @property
+    def offload_stats(self) -> dict:
+        """
+        Number of calls and seconds spent decoding and parsing inline on the event loop and in the executor.
+
+        :return: :class:`dict`
+        """
+        return self.http.offload_stats
+
+    @property
+    def ratelimits(self) -> dict:
+        """
+        Current state of the client-side rate-limit buckets, keyed by route. Useful for monitoring.
+
+        :return: :class:`dict`
+        """
+        return self.http.ratelimiter.state if self.http.ratelimiter is not None else {}
+
+    async def close(self):
+        """|coro|
+
+        Stops background tasks and in-flight fetches, closes the shared HTTP connection pool and the on-disk cache.
+        The client can not be used afterwards.
+        """
+        for task in self._tasks:
+            task.cancel()
+        self._tasks.clear()
+        await self.voting_cache.close()
+        await self.api_cache.close()
+        if self.webhook is not None:
+            await self.webhook.stop()
+        await self.http.close()
+        if self._guild_counts:
+            self.bot.remove_listener(self._on_guild_join, "on_guild_join")
+            self.bot.remove_listener(self._on_guild_remove, "on_guild_remove")
+        if self.cluster is not None:
+            self.cluster.close()
+        if self._owns_executor:
+            # Waited on in a thread, so that workers finishing up do not block the loop.
+            await self.loop.run_in_executor(None, self.http.executor.shutdown)
+        if self.cache is not None:
+            self.voting_cache.flush()
+            self.cache.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
 
     @classmethod
     def pluggable(cls, bot, api_key: str, *args, **kwargs):
@@ -138,7 +534,8 @@ class Client:
             bot.dbl = cls(api_key, bot=bot, *args, **kwargs)
             return bot.dbl
 
-    async def has_user_voted(self, user: int or discord.User or discord.Member) -> bool:
+    async def has_user_voted(self, user: "int or discord.User or discord.Member",
+                             within: datetime.timedelta = None, timeout: float = None) -> bool:
         """|coro|
 
         Returns True if specified user has voted, False if not.
@@ -149,21 +546,48 @@ class Client:
         --------------
         user: int, discord.User, discord.Member
             Specify user you want to check.
+        within: Optional[datetime.timedelta]
+            *Not required*
+            Only count votes from this long ago. Vote times are known for votes received through the webhook
+            or first seen by a later poll; votes already listed when the client started only count for the
+            whole ``vote_days`` window.
+            **Default:** ``vote_days``
+        timeout: Optional[float]
+            *Not required*
+            Seconds to wait for the result at most, within any enclosing :func:`dblapi.deadline`. Raises
+            :class:`asyncio.TimeoutError` when exceeded.
 
 
         :return: :class:`bool`
         """
-        if isinstance(user, discord.User) or isinstance(user, discord.Member):
-            user = user.id
-        if str(user) in await self.voting_cache.get:
-            return True
-        else:
-            return False
+        user = getattr(user, "id", user)
+        store = await wait(self.voting_cache.get, timeout)
+        return store.has_voted(int(user), within.total_seconds() if within is not None else None)
+
+    async def votes_since(self, since: datetime.datetime or float) -> list:
+        """|coro|
+
+        Returns :class:`list` of IDs of users whose latest vote is known to be at or after ``since``, oldest first.
+
+
+        Parameters
+        --------------
+        since: datetime.datetime, float
+            Aware :class:`datetime.datetime` or UNIX timestamp.
+
+
+        :return: :class:`list`
+        """
+        if isinstance(since, datetime.datetime):
+            since = since.timestamp()
+        store = await self.voting_cache.get
+        return list(store.votes_since(since))
 
     async def iter_users_that_voted(self, iterable: bool = True):
         """|coro|
 
-        If iterable parameter is True or not set outputs iterable for all users that have voted. If parameter set to False, returns :class:`list` of :class:`discord.User`.
+        If iterable parameter is True or not set outputs iterable for all users that have voted. If parameter set to False, yields a single set-like view of voter IDs as :class:`int`.
+        Without a bot, the iterable outputs user IDs as :class:`int` instead of users.
 
 
         Parameters
@@ -172,16 +596,17 @@ class Client:
             Should this function output an iterable.
 
 
-        :return: :class:`list`
+        :return: :class:`set`
         """
         if iterable:
-            for user in await self.voting_cache.get:
-                yield self.bot.get_user(int(user))
+            # Copied, because votes may arrive while the caller is iterating.
+            for user in list((await self.voting_cache.get).users):
+                yield self.bot.get_user(user) if self.bot is not None else user
         else:
-            yield await self.voting_cache.get
+            yield (await self.voting_cache.get).users
 
     async def search_bots(self, search: str, limit: int = 50, sort_by: str = None, offset: int = 0,
-                          fields: str = None) -> list:
+                          fields: str = None, timeout: float = None) -> list:
         """|coro|
 
         Search function for bots. Use search parameter to search for bots. This function returns :class:`list` of :class:`DBLBot` objects.
@@ -204,10 +629,106 @@ class Client:
         fields: Optional[str]
             *Not required*
             Search specified comma-separated fields.
+        timeout: Optional[float]
+            *Not required*
+            Seconds to wait for the result at most, within any enclosing :func:`dblapi.deadline`. Raises
+            :class:`asyncio.TimeoutError` when exceeded.
 
 
         :return: :class:`list`
         """
+        params = self._search_params(search, limit, sort_by, offset, fields)
+        return await wait(self._cached_get("search", self.router.bot_search(), params=params,
+                                           parse=self._parse_search, bucket=self.router.bot_search.bucket), timeout)
+
+    async def iter_bots(self, search: str, sort_by: str = None, fields: str = None, page_size: int = 500,
+                        prefetch: bool = True):
+        """
+        Iterates over all bots matching the search, page by page. Use as ``async for bot in client.iter_bots(...)``.
+        Yields :class:`DBLBot` objects as they are consumed, and only keeps the current page in memory.
+        While the current page is being consumed, the next one is requested in the background.
+        Breaking out of the loop stops further requests.
+
+
+        Parameters
+        --------------
+        search: str
+            Search string
+        sort_by: Optional[str]
+            *Not required*
+            Sort bots by specified criteria.
+        fields: Optional[str]
+            *Not required*
+            Search specified comma-separated fields.
+        page_size: Optional[int]
+            *Not required*
+            Number of bots requested per page, from 1 to 500.
+            **Default:** 500
+        prefetch: Optional[bool]
+            *Not required*
+            Request the next page while the current one is consumed.
+            **Default:** True
+        """
+        if not 0 < page_size <= 500:
+            raise InvalidArgument("page_size must be from 1 to 500")
+        url = self.router.bot_search()
+
+        def fetch(offset):
+            return self.loop.create_task(
+                self.http.get(url, params=self._search_params(search, page_size, sort_by, offset, fields),
+                              bucket=self.router.bot_search.bucket))
+
+        offset = 0
+        next_page = fetch(offset)
+        try:
+            while next_page is not None:
+                r = await next_page
+                results = r.get('results', []) if isinstance(r, dict) else []
+                offset += len(results)
+                # A short page does not mean the last one; DBL may return fewer bots than asked for.
+                more = bool(results) and offset < r.get('total', float('inf'))
+                next_page = fetch(offset) if more and prefetch else None
+                for bot in results:
+                    yield DBLBot.parse(bot, self)
+                if more and next_page is None:
+                    next_page = fetch(offset)
+        finally:
+            if next_page is not None:
+                next_page.cancel()
+
+    async def stream_bots(self, search: str, limit: int = 500, sort_by: str = None, offset: int = 0,
+                          fields: str = None):
+        """
+        Streaming variant of :meth:`search_bots`. Use as ``async for bot in client.stream_bots(...)``.
+        Yields :class:`DBLBot` objects while the response is still arriving, without buffering the whole page.
+        Results are not cached.
+
+
+        Parameters
+        --------------
+        search: str
+            Search string
+        limit: Optional[int]
+            *Not required*
+            Limit results to specified number. Cannot be negative. Max 500.
+            **Default:** 500
+        sort_by: Optional[str]
+            *Not required*
+            Sort bots by specified criteria.
+        offset: Optional[int]
+            *Not required*
+            Offset output by specified number.
+        fields: Optional[str]
+            *Not required*
+            Search specified comma-separated fields.
+        """
+        async for bot in self.http.stream(self.router.bot_search(), JSONArrayParser("results"),
+                                          params=self._search_params(search, limit, sort_by, offset, fields),
+                                          bucket=self.router.bot_search.bucket, time_slice=self.stream_slice):
+            yield DBLBot.parse(bot, self)
+
+    @staticmethod
+    def _search_params(search: str, limit: int, sort_by: str, offset: int, fields: str) -> dict:
         params = {
             "search": search,
             "limit": limit,
@@ -217,13 +738,15 @@ class Client:
             params.update({"sort": sort_by})
         if fields:
             params.update(({"fields": fields}))
-        r = await self.http.get(self.router.bot_search, params=params)
+        return params
+
+    def _parse_search(self, r) -> list:
         rdata = []
         for bot in r['results']:
             rdata.append(DBLBot.parse(bot, self))
         return rdata
 
-    async def get_bot(self, bot_id: int) -> DBLBot:
+    async def get_bot(self, bot_id: int, timeout: float = None) -> DBLBot:
         """|coro|
 
         Returns :class:`dblapi.data_objects.DBLBot` class of the specified bot ID.
@@ -233,14 +756,77 @@ class Client:
         --------------
         bot_id: :class:`int`
             Bot's Client ID
+        timeout: Optional[float]
+            *Not required*
+            Seconds to wait for the result at most, within any enclosing :func:`dblapi.deadline`. Raises
+            :class:`asyncio.TimeoutError` when exceeded.
 
 
         :return: :class:`dblapi.data_objects.DBLBot`
         """
-        r = await self.http.get(self.router.bot_get.format_url(bot_id))
-        return DBLBot.parse(r, self)
+        return await wait(self._cached_get("bot", self.router.bot_get(bot_id), parse=lambda r: DBLBot.parse(r, self),
+                                           bucket=self.router.bot_get.bucket), timeout)
+
+    async def get_bots(self, bot_ids, concurrency: int = 10) -> list:
+        """|coro|
+
+        Returns :class:`list` of :class:`dblapi.data_objects.DBLBot` for the specified bot IDs, in the same order.
+        Bots are fetched concurrently and served from cache where possible. If a bot could not be fetched, its
+        place in the list holds the exception instead, so one failure does not fail the whole batch.
+
+
+        Parameters
+        --------------
+        bot_ids: iterable of :class:`int`
+            Bots' Client IDs. Duplicates are fetched once.
+        concurrency: Optional[int]
+            *Not required*
+            Maximum number of requests in flight at once.
+            **Default:** 10
+
+
+        :return: :class:`list`
+        """
+        bot_ids = [int(bot_id) for bot_id in bot_ids]
+        results = {}
+        async for bot_id, result in self.get_bots_as_completed(bot_ids, concurrency):
+            results[bot_id] = result
+        return [results[bot_id] for bot_id in bot_ids]
+
+    async def get_bots_as_completed(self, bot_ids, concurrency: int = 10):
+        """
+        Async iterator variant of :meth:`get_bots`. Yields ``(bot_id, result)`` tuples as soon as each bot
+        is fetched, where ``result`` is a :class:`dblapi.data_objects.DBLBot` or the exception raised for it.
+        Leaving the loop early cancels the remaining requests.
+
+
+        Parameters
+        --------------
+        bot_ids: iterable of :class:`int`
+            Bots' Client IDs. Duplicates are fetched once.
+        concurrency: Optional[int]
+            *Not required*
+            Maximum number of requests in flight at once.
+            **Default:** 10
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def fetch(bot_id):
+            async with semaphore:
+                try:
+                    return bot_id, await self.get_bot(bot_id)
+                except Exception as e:
+                    return bot_id, e
+
+        tasks = [self.loop.create_task(fetch(bot_id)) for bot_id in dict.fromkeys(int(b) for b in bot_ids)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
 
-    async def get_bot_stats(self, bot_id: int) -> DBLStats:
+    async def get_bot_stats(self, bot_id: int, timeout: float = None) -> DBLStats:
         """|coro|
 
         Returns :class:`DBLStats` class of the specified bot ID.
@@ -250,9 +836,49 @@ class Client:
         --------------
         bot_id: :class:`int`
             Bot's Client ID
+        timeout: Optional[float]
+            *Not required*
+            Seconds to wait for the result at most, within any enclosing :func:`dblapi.deadline`. Raises
+            :class:`asyncio.TimeoutError` when exceeded.
 
 
         :return: :class:`dblapi.data_objects.DBLStats`
         """
-        r = await self.http.get(self.router.bot_stats.format_url(bot_id))
-        return DBLStats(r)
+        return await wait(self._cached_get("stats", self.router.bot_stats(bot_id), parse=DBLStats,
+                                           bucket=self.router.bot_stats.bucket), timeout)
+
+    async def post_stats(self, server_count: int = None, shards: list = None, shard_id: int = None,
+                         shard_count: int = None) -> dict:
+        """|coro|
+
+        Posts your bot's statistics to DBL. Clients with a bot post them in the background, so this is mostly
+        useful without one, e.g. in a worker that gets guild counts from elsewhere. Raises
+        :class:`dblapi.errors.WeirdResponse` if DBL rejects them.
+
+
+        Parameters
+        --------------
+        server_count: :class:`int`
+            Number of servers the bot (or shard ``shard_id``) is in. Required unless ``shards`` is given.
+        shards: Optional[:class:`list`]
+            *Not required*
+            Number of servers of every shard, indexed by shard ID.
+        shard_id: Optional[:class:`int`]
+            *Not required*
+            Shard the ``server_count`` is of.
+        shard_count: Optional[:class:`int`]
+            *Not required*
+            Total number of shards.
+
+
+        :return: :class:`dict`
+        """
+        if server_count is None and shards is None:
+            raise InvalidArgument("server_count or shards is required")
+        data = {"shards": list(shards)} if shards is not None else {"server_count": server_count}
+        if shard_id is not None:
+            data["shard_id"] = shard_id
+        if shard_count is not None:
+            data["shard_count"] = shard_count
+        await self._ready.wait()
+        return await self._post_stats(data)
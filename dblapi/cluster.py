@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+
+# The MIT License (MIT)
+# Copyright (c) 2018 AndyTempel
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+# OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+import json
+import logging
+import os
+import time
+
+log = logging.getLogger(__name__)
+
+
+class ClusterStats:
+    """
+    Shares guild counts between the processes of a bot cluster through a directory all of them can reach,
+    so that a single process posts statistics for the whole cluster.
+
+    Every process publishes its per-shard guild counts to its own file. The process with the lowest
+    ``process_id`` among those that published within ``stale_after`` seconds is the leader and posts for
+    everyone; if it stops publishing, the next one takes over.
+
+    Parameters
+    -------------
+    directory: :class:`str`
+        Directory shared by the processes of the cluster.
+    process_id: :class:`str`
+        Unique, stable name of this process within the cluster, e.g. its first shard ID.
+    stale_after: :class:`float`
+        Seconds after which counts of a process that stopped publishing are ignored.
+    """
+
+    def __init__(self, directory: str, process_id: str, stale_after: float = 900.0):
+        self.directory = directory
+        self.process_id = str(process_id)
+        self.stale_after = stale_after
+        os.makedirs(directory, exist_ok=True)
+
+    @property
+    def path(self) -> str:
+        return os.path.join(self.directory, f"{self.process_id}.json")
+
+    def publish(self, shards: dict, shard_count: int):
+        """Writes this process' guild counts, keyed by shard ID."""
+        data = {"process_id": self.process_id, "shard_count": shard_count, "updated": time.time(),
+                "shards": {str(shard_id): count for shard_id, count in shards.items()}}
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(data, f)
+        # Atomic, so readers never see a half-written file.
+        os.replace(tmp, self.path)
+
+    def _read(self) -> list:
+        cutoff = time.time() - self.stale_after
+        published = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.directory, name)) as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if data.get("updated", 0) >= cutoff:
+                published.append(data)
+        return published
+
+    def is_leader(self) -> bool:
+        published = self._read()
+        return bool(published) and min(data["process_id"] for data in published) == self.process_id
+
+    def collect(self) -> tuple:
+        """
+        Returns ``(shards, shard_count)``: guild counts of all shards of the cluster as :class:`list` indexed by
+        shard ID, with ``None`` for shards nobody published, and the cluster's shard count.
+        """
+        published = self._read()
+        shard_count = max([data["shard_count"] for data in published] or [0])
+        counts = {}
+        for data in published:
+            counts.update(data["shards"])
+        shard_count = max([shard_count] + [int(shard_id) + 1 for shard_id in counts])
+        return [counts.get(str(shard_id)) for shard_id in range(shard_count)], shard_count
+
+    def close(self):
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
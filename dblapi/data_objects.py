@@ -16,13 +16,26 @@
 # FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
 # DEALINGS IN THE SOFTWARE.
 
-import dateutil.parser
+import datetime
 
 from .errors import *
 
 VALID_STATIC_FORMATS = {"jpeg", "jpg", "webp", "png"}
 VALID_AVATAR_FORMATS = VALID_STATIC_FORMATS | {"gif"}
 
+_MISSING = object()
+
+
+def parse_date(date: str) -> datetime.datetime:
+    """Parses DBL's ISO 8601 dates with the standard library, falling back to dateutil for anything else."""
+    try:
+        if date.endswith("Z"):
+            date = date[:-1] + "+00:00"
+        return datetime.datetime.fromisoformat(date)
+    except (ValueError, AttributeError):
+        import dateutil.parser
+        return dateutil.parser.parse(date)
+
 
 class Avatar:
     """
@@ -65,6 +78,8 @@ class Avatar:
         Returns URL of default avatar.
     """
 
+    __slots__ = ("hash", "base_url", "default_avatar_url")
+
     def __init__(self, img_hash, bot_id: int):
         """
 
@@ -171,6 +186,8 @@ class Description:
 
     """
 
+    __slots__ = ("short", "long")
+
     def __init__(self, short, long):
         self.short = short
         self.long = long
@@ -209,6 +226,8 @@ class DBLStats:
 
     """
 
+    __slots__ = ("server_count", "shard_count", "shards")
+
     def __init__(self, data):
         self.server_count = data.get("server_count", "N/A")
         self.shard_count = data.get("shard_count", "N/A")
@@ -262,31 +281,68 @@ class DBLBot:
 
     """
 
+    __slots__ = ("client", "id", "username", "discriminator", "library", "prefix", "tags", "owners",
+                 "is_certified", "votes", "website", "github", "invite", "_def_avatar", "_short_desc", "_date",
+                 "_other", "_avatar", "_description", "_approved_date")
+
     def __init__(self, snowflake: str, username: str, discriminator: str, def_avatar: str, lib: str, prefix: str,
                  short_desc: str, tags: list, owners: list, date: str, certified: bool, votes: int, other, client):
-        self._stats_got = False
-        self._stats_obj = None
-
         self.client = client
         self.id = int(snowflake)
         self.username = username
         self.discriminator = int(discriminator)
-        self.username_full = f"{self.username}#{self.discriminator}"
-        self.mention = f"<@{self.id}>"
-        self.avatar = Avatar(other.get("avatar", def_avatar), self.id)
         self.library = lib
         self.prefix = prefix
-        self.description = Description(short_desc, other.get("long_desc", ""))
         self.tags = tags
         self.owners = owners
-        self.approved_date = dateutil.parser.parse(date)
         self.is_certified = certified
         self.votes = votes
         self.website = other.get("website", "")
         self.github = other.get("github", "")
-        self.link = f"https://discordbots.org/bot/{other.get('vanity', self.id)}"
         self.invite = other.get("invite", "")
-        self.support = f"https://discord.gg/{other.get('support', '')}"
+
+        # Everything below is only built when first accessed.
+        self._def_avatar = def_avatar
+        self._short_desc = short_desc
+        self._date = date
+        self._other = other
+        self._avatar = _MISSING
+        self._description = _MISSING
+        self._approved_date = _MISSING
+
+    @property
+    def username_full(self) -> str:
+        return f"{self.username}#{self.discriminator}"
+
+    @property
+    def mention(self) -> str:
+        return f"<@{self.id}>"
+
+    @property
+    def avatar(self) -> Avatar:
+        if self._avatar is _MISSING:
+            self._avatar = Avatar(self._other.get("avatar", self._def_avatar), self.id)
+        return self._avatar
+
+    @property
+    def description(self) -> Description:
+        if self._description is _MISSING:
+            self._description = Description(self._short_desc, self._other.get("long_desc", ""))
+        return self._description
+
+    @property
+    def approved_date(self) -> datetime.datetime:
+        if self._approved_date is _MISSING:
+            self._approved_date = parse_date(self._date)
+        return self._approved_date
+
+    @property
+    def link(self) -> str:
+        return f"https://discordbots.org/bot/{self._other.get('vanity', self.id)}"
+
+    @property
+    def support(self) -> str:
+        return f"https://discord.gg/{self._other.get('support', '')}"
 
     @classmethod
     def parse(cls, resp, client):
@@ -303,16 +359,9 @@ class DBLBot:
     async def stats(self) -> DBLStats:
         """|coro|
 
-        Gets bot's statistics from DBL.
+        Gets bot's statistics from DBL. Shares the client's statistics cache.
 
         :return: :class:`DBLStats`
             Returns :class:`DBLStats` object.
         """
-        if self._stats_got and self._stats_obj:
-            return self._stats_obj
-        else:
-            r = await self.client.http.get(self.client.router.bot_stats.format_url(self.id))
-            obj = DBLStats(r)
-            self._stats_got = True
-            self._stats_obj = obj
-            return obj
+        return await self.client.get_bot_stats(self.id)
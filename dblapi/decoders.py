@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+
+# The MIT License (MIT)
+# Copyright (c) 2018 AndyTempel
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+# OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+import codecs
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+from .errors import WeirdResponse
+
+# The fastest JSON decoder available. All of them accept the raw response body as bytes.
+if orjson is not None:
+    json_loads = orjson.loads
+elif ujson is not None:
+    json_loads = ujson.loads
+else:
+    json_loads = json.loads
+
+
+def decode_vote_ids(raw: bytes) -> set:
+    """
+    Decodes the ``onlyids`` vote list, a JSON array of ID strings, straight into a :class:`set` of :class:`int`
+    without building the intermediate list of :class:`str`.
+    """
+    body = raw.strip()
+    if not body.startswith(b"[") or not body.endswith(b"]"):
+        raise WeirdResponse
+    if b'"' in body:
+        # ["1", "2", ...]: every second piece between quotes is an ID.
+        ids = body.split(b'"')[1::2]
+    else:
+        body = body[1:-1].strip()
+        ids = body.split(b",") if body else ()
+    return set(map(int, ids))
+
+
+_NOT_DIGITS = bytes(b if 48 <= b <= 57 else 32 for b in range(256))
+
+
+class VoteIdParser:
+    """
+    Incremental version of :func:`decode_vote_ids`. :meth:`feed` takes the body in chunks of any size and
+    returns the IDs completed so far, keeping a partial ID over to the next chunk. :meth:`close` raises
+    :class:`WeirdResponse` unless the whole array arrived.
+    """
+
+    def __init__(self):
+        self._tail = b""
+        self._started = False
+        self._ended = False
+
+    def feed(self, chunk: bytes) -> list:
+        data = self._tail + chunk
+        if not self._started:
+            data = data.lstrip()
+            if not data:
+                return []
+            if not data.startswith(b"["):
+                raise WeirdResponse
+            self._started = True
+        if b"]" in chunk:
+            self._ended = True
+        # Everything up to the last non-digit is complete.
+        ids = data.translate(_NOT_DIGITS).split()
+        if ids and data[-1:].isdigit():
+            self._tail = ids.pop()
+        else:
+            self._tail = b""
+        return [int(user) for user in ids]
+
+    def close(self) -> list:
+        # A truncated list would make voters missing from it look like they stopped voting.
+        if not self._ended:
+            raise WeirdResponse
+        return []
+
+
+class JSONArrayParser:
+    """
+    Incrementally parses the JSON objects of one array inside a response, e.g. the ``results`` of a search,
+    so that each object is available as soon as its bytes arrived. :meth:`feed` takes the body in chunks
+    and returns the objects completed so far. Without ``key`` the body itself is the array. :meth:`close` raises
+    :class:`WeirdResponse` unless the whole array arrived.
+    """
+
+    def __init__(self, key: str = None):
+        self._key = f'"{key}"' if key else None
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._scanner = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._in_array = False
+        self.done = False
+
+    def _find_array(self) -> bool:
+        start = 0
+        if self._key is not None:
+            start = self._buffer.find(self._key)
+            if start == -1:
+                return False
+            start += len(self._key)
+        start = self._buffer.find("[", start)
+        if start == -1:
+            return False
+        self._pos = start + 1
+        self._in_array = True
+        return True
+
+    def feed(self, chunk: bytes) -> list:
+        if self.done:
+            return []
+        self._buffer += self._decoder.decode(chunk)
+        if not self._in_array and not self._find_array():
+            return []
+        items = []
+        buffer, pos = self._buffer, self._pos
+        length = len(buffer)
+        while True:
+            while pos < length and buffer[pos] in " \t\r\n,":
+                pos += 1
+            if pos >= length:
+                break
+            if buffer[pos] == "]":
+                self.done = True
+                break
+            try:
+                item, pos = self._scanner.raw_decode(buffer, pos)
+            except ValueError:
+                # The object is not complete yet.
+                break
+            items.append(item)
+        # Drop what has been parsed so the buffer only holds the incomplete rest.
+        self._buffer, self._pos = buffer[pos:], 0
+        return items
+
+    def close(self) -> list:
+        if not self.done:
+            raise WeirdResponse
+        return []
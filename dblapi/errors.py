@@ -29,3 +29,28 @@ class WeirdResponse(Exception):
 
 class InvalidArgument(Exception):
     pass
+
+
+class RateLimited(Exception):
+    """Raised when DBL keeps answering with 429 after the request was retried."""
+
+    def __init__(self, retry_after: float):
+        self.retry_after = retry_after
+        super().__init__(f"Rate limited by DBL, retry after {retry_after} seconds")
+
+
+class HTTPException(Exception):
+    """Raised when DBL keeps failing with a server error after the request was retried."""
+
+    def __init__(self, status: int, text: str = ""):
+        self.status = status
+        self.text = text
+        super().__init__(f"DBL responded with {status}: {text[:200]}")
+
+
+class CircuitOpen(Exception):
+    """Raised without sending a request while DBL is considered down."""
+
+    def __init__(self, retry_in: float):
+        self.retry_in = retry_in
+        super().__init__(f"DBL is unavailable, not sending requests for another {retry_in:.1f} seconds")
@@ -18,10 +18,26 @@
 # FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
 # DEALINGS IN THE SOFTWARE.
 
+from .decoders import VoteIdParser, decode_vote_ids
+from .errors import WeirdResponse
+
 
 async def update_vote_cache(client, **kwargs):
-    r = await client.http.get(client.router.bot_votes, params={
+    # A vote check before the bot is ready would otherwise request the votes of bot None.
+    await client._ready.wait()
+    params = {
         "onlyids": "true",
         "days": kwargs.get("days", 31)
-    })
+    }
+    if client.stream_responses:
+        voters = set()
+        async for user in client.http.stream(client.router.bot_votes(client.bot_id), VoteIdParser(),
+                                             params=params, bucket=client.router.bot_votes.bucket,
+                                             time_slice=client.stream_slice):
+            voters.add(user)
+        return voters
+    r = await client.http.get(client.router.bot_votes(client.bot_id), params=params,
+                              bucket=client.router.bot_votes.bucket, decoder=decode_vote_ids)
+    if not isinstance(r, set):
+        raise WeirdResponse
     return r
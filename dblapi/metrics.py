@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+
+# The MIT License (MIT)
+# Copyright (c) 2018 AndyTempel
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+# OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+import logging
+import time
+from bisect import bisect_left
+
+log = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Histogram:
+    """Non-cumulative histogram with fixed upper bounds; the last bucket counts everything above them."""
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds=LATENCY_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def snapshot(self) -> dict:
+        return {"buckets": dict(zip([*map(str, self.bounds), "+Inf"], self.counts)), "sum": self.sum,
+                "count": self.count}
+
+
+class Metrics:
+    """
+    Collects per-route request metrics and cache counters of a :class:`dblapi.Client`.
+
+    Routes are labelled by their rate-limit bucket, e.g. ``GET https://discordbots.org/api/bots/{}``.
+    Callbacks appended to :attr:`on_request_start` are called as ``callback(route, method, url)`` before
+    every HTTP request, callbacks in :attr:`on_request_end` as
+    ``callback(route, method, url, status, elapsed, error)`` after it. Exceptions raised by callbacks are
+    logged and ignored.
+    """
+
+    def __init__(self):
+        self.latency = {}
+        self.statuses = {}
+        self.errors = {}
+        self.retries = {}
+        self.bytes_received = {}
+        self.inflight = {}
+        self.cache = {}
+        self.on_request_start = []
+        self.on_request_end = []
+
+    def request_started(self, route: str, method: str, url) -> float:
+        self.inflight[route] = self.inflight.get(route, 0) + 1
+        if self.on_request_start:
+            self._call(self.on_request_start, route, method, url)
+        return time.perf_counter()
+
+    def request_finished(self, route: str, method: str, url, started: float, status: int = None, size: int = 0,
+                         error: BaseException = None):
+        elapsed = time.perf_counter() - started
+        self.inflight[route] -= 1
+        try:
+            histogram = self.latency[route]
+        except KeyError:
+            histogram = self.latency[route] = Histogram()
+        histogram.observe(elapsed)
+        if status is not None:
+            key = (route, status)
+            self.statuses[key] = self.statuses.get(key, 0) + 1
+        if error is not None:
+            key = (route, type(error).__name__)
+            self.errors[key] = self.errors.get(key, 0) + 1
+        if size:
+            self.bytes_received[route] = self.bytes_received.get(route, 0) + size
+        if self.on_request_end:
+            self._call(self.on_request_end, route, method, url, status, elapsed, error)
+
+    def retry(self, route: str):
+        self.retries[route] = self.retries.get(route, 0) + 1
+
+    def cache_event(self, cache: str, event: str):
+        """Counts a cache ``event`` such as ``"hits"``, ``"misses"``, ``"refreshes"`` or ``"evictions"``."""
+        try:
+            counters = self.cache[cache]
+        except KeyError:
+            counters = self.cache[cache] = {}
+        counters[event] = counters.get(event, 0) + 1
+
+    @staticmethod
+    def _call(callbacks, *args):
+        for callback in callbacks:
+            try:
+                callback(*args)
+            except Exception:
+                log.exception("Metrics callback failed")
+
+    def snapshot(self) -> dict:
+        """All metrics as plain :class:`dict`."""
+        return {
+            "latency": {route: histogram.snapshot() for route, histogram in self.latency.items()},
+            "statuses": {f"{route} {status}": count for (route, status), count in self.statuses.items()},
+            "errors": {f"{route} {error}": count for (route, error), count in self.errors.items()},
+            "retries": dict(self.retries),
+            "bytes_received": dict(self.bytes_received),
+            "inflight": dict(self.inflight),
+            "cache": {cache: dict(counters) for cache, counters in self.cache.items()}
+        }
+
+    def prometheus(self, prefix: str = "dblapi") -> str:
+        """All metrics in the Prometheus text exposition format."""
+        lines = []
+
+        def metric(name, kind, help_text):
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+
+        def labels(**values):
+            return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in values.items()) + "}"
+
+        metric("request_duration_seconds", "histogram", "Latency of HTTP requests to DBL.")
+        for route, histogram in self.latency.items():
+            cumulative = 0
+            for bound, count in zip([*map(str, histogram.bounds), "+Inf"], histogram.counts):
+                cumulative += count
+                lines.append(f"{prefix}_request_duration_seconds_bucket{labels(route=route, le=bound)} {cumulative}")
+            lines.append(f"{prefix}_request_duration_seconds_sum{labels(route=route)} {histogram.sum}")
+            lines.append(f"{prefix}_request_duration_seconds_count{labels(route=route)} {histogram.count}")
+        metric("responses_total", "counter", "HTTP responses by status code.")
+        for (route, status), count in self.statuses.items():
+            lines.append(f"{prefix}_responses_total{labels(route=route, status=status)} {count}")
+        metric("request_errors_total", "counter", "Requests that failed without a response.")
+        for (route, error), count in self.errors.items():
+            lines.append(f"{prefix}_request_errors_total{labels(route=route, error=error)} {count}")
+        metric("retries_total", "counter", "Retried requests.")
+        for route, count in self.retries.items():
+            lines.append(f"{prefix}_retries_total{labels(route=route)} {count}")
+        metric("received_bytes_total", "counter", "Response body bytes received.")
+        for route, count in self.bytes_received.items():
+            lines.append(f"{prefix}_received_bytes_total{labels(route=route)} {count}")
+        metric("requests_in_flight", "gauge", "Requests currently in flight.")
+        for route, count in self.inflight.items():
+            lines.append(f"{prefix}_requests_in_flight{labels(route=route)} {count}")
+        metric("cache_events_total", "counter", "Cache hits, misses, refreshes and evictions.")
+        for cache, counters in self.cache.items():
+            for event, count in counters.items():
+                lines.append(f"{prefix}_cache_events_total{labels(cache=cache, event=event)} {count}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+
+# The MIT License (MIT)
+# Copyright (c) 2018 AndyTempel
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+# OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+import asyncio
+import logging
+import time
+
+log = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """
+    Token bucket allowing ``rate`` requests every ``per`` seconds. Callers of :meth:`acquire` queue up in
+    arrival order until a token is available. The bucket can be paused, e.g. by a 429 ``Retry-After``,
+    and resynchronised from the rate-limit headers DBL sends.
+    """
+
+    def __init__(self, rate: int = 60, per: float = 60.0):
+        self.rate = rate
+        self.per = per
+        self.tokens = float(rate)
+        self.blocked_until = 0.0
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+        self.waiting = 0
+
+    def _refill(self, now: float):
+        self.tokens = min(float(self.rate), self.tokens + (now - self._updated) * self.rate / self.per)
+        self._updated = now
+
+    async def acquire(self):
+        self.waiting += 1
+        try:
+            async with self._lock:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    if now < self.blocked_until:
+                        await asyncio.sleep(self.blocked_until - now)
+                    elif self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    else:
+                        await asyncio.sleep((1 - self.tokens) * self.per / self.rate)
+        finally:
+            self.waiting -= 1
+
+    def block(self, seconds: float):
+        """Stops handing out tokens for ``seconds``."""
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+        self.tokens = 0.0
+
+    def update(self, headers):
+        """Resynchronises the bucket with ``X-RateLimit-*`` response headers, if present."""
+        try:
+            remaining = headers.get("X-RateLimit-Remaining")
+            if remaining is not None:
+                self._refill(time.monotonic())
+                self.tokens = min(self.tokens, float(remaining))
+                if float(remaining) < 1:
+                    reset = headers.get("X-RateLimit-Reset-After") or headers.get("X-RateLimit-Reset")
+                    if reset is not None:
+                        reset = float(reset)
+                        # DBL may send either an epoch timestamp or seconds until the reset.
+                        if reset > 1e9:
+                            reset -= time.time()
+                        self.block(reset)
+        except ValueError:
+            log.debug("Ignoring malformed rate-limit headers: %r", headers)
+
+    @property
+    def state(self) -> dict:
+        now = time.monotonic()
+        self._refill(now)
+        return {
+            "rate": self.rate,
+            "per": self.per,
+            "tokens": round(self.tokens, 3),
+            "blocked_for": round(max(0.0, self.blocked_until - now), 3),
+            "waiting": self.waiting
+        }
+
+
+class RateLimiter:
+    """
+    Keeps one :class:`TokenBucket` per route. Buckets are created on first use with the default
+    ``rate`` / ``per``; ``overrides`` maps bucket keys to their own ``(rate, per)``.
+    """
+
+    def __init__(self, rate: int = 60, per: float = 60.0, overrides: dict = None):
+        self.rate = rate
+        self.per = per
+        self.overrides = overrides or {}
+        self.buckets = {}
+
+    def bucket(self, key: str) -> TokenBucket:
+        try:
+            return self.buckets[key]
+        except KeyError:
+            bucket = self.buckets[key] = TokenBucket(*self.overrides.get(key, (self.rate, self.per)))
+            return bucket
+
+    @property
+    def state(self) -> dict:
+        return {key: bucket.state for key, bucket in self.buckets.items()}
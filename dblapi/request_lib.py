@@ -18,58 +18,341 @@
 # FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
 # DEALINGS IN THE SOFTWARE.
 
+import asyncio
+import logging
 import sys
-import traceback
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+
 import aiohttp
+from multidict import CIMultiDict, CIMultiDictProxy, MultiDict, MultiDictProxy
 
 from dblapi import __version__
+from .decoders import json_loads as default_json_loads
+from .errors import HTTPException, RateLimited
+from .metrics import Metrics
+from .ratelimit import RateLimiter
+from .retry import CircuitBreaker, RetryPolicy
+from .timeouts import DeadlineExceeded, remaining, wait
+
+log = logging.getLogger(__name__)
 
 
 class krequest(object):
-    def __init__(self, return_json=True, global_headers=[]):
-        self.headers = {
+    def __init__(self, return_json=True, global_headers=None, limit: int = 100, limit_per_host: int = 20,
+                 keepalive_timeout: float = 30.0, ttl_dns_cache: int = 300, verify: bool = True,
+                 ratelimiter: RateLimiter = None, max_ratelimit_retries: int = 3, retry: RetryPolicy = None,
+                 breaker: CircuitBreaker = None, json_loads=None, executor: Executor = None,
+                 offload_threshold: int = 262144, metrics: Metrics = None, timeout: aiohttp.ClientTimeout = None):
+        headers = CIMultiDict({
             "User-Agent": "DBLAPI/{} (Github: AndyTempel) KRequests/alpha "
                           "(Custom asynchronous HTTP client)".format(__version__),
             "X-Powered-By": "Python {}".format(sys.version)
-        }
+        })
+        for name, value in global_headers or ():
+            headers[name] = value
+        # Sent with every request by the session; read-only, so that it can not drift from what the session sends.
+        self.headers = CIMultiDictProxy(headers)
         self.return_json = return_json
-        for name, value in global_headers:
-            self.headers.update({
-                name: value
-            })
+        self.json_loads = json_loads or default_json_loads
+        self.executor = executor
+        self.offload_threshold = offload_threshold
+        self.offload_stats = {mode: {"calls": 0, "seconds": 0.0} for mode in ("inline", "executor")}
+
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.ttl_dns_cache = ttl_dns_cache
+        self.verify = verify
+        self.ratelimiter = ratelimiter
+        self.max_ratelimit_retries = max_ratelimit_retries
+        self.retry = retry or RetryPolicy()
+        self.breaker = breaker
+        self.metrics = metrics
+        self.timeout = self._client_timeout(timeout) or aiohttp.ClientTimeout(total=30, sock_connect=10)
+        self._session = None
+        self._closed = False
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """Shared session, created on first use so that it binds to the running loop."""
+        if self._closed:
+            raise RuntimeError("krequest is closed")
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.limit, limit_per_host=self.limit_per_host,
+                                             keepalive_timeout=self.keepalive_timeout,
+                                             ttl_dns_cache=self.ttl_dns_cache, ssl=self._ssl(self.verify))
+            self._session = aiohttp.ClientSession(connector=connector, headers=self.headers, timeout=self.timeout)
+        return self._session
+
+    @property
+    def closed(self) -> bool:
+        return self._session is None or self._session.closed
+
+    async def close(self):
+        """Closes the shared session. Requests made afterwards raise :class:`RuntimeError`."""
+        self._closed = True
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    @staticmethod
+    def _ssl(verify):
+        # Before aiohttp 3.9 any ssl value other than None or an SSLContext turns verification off, even True.
+        # None verifies, and per request defers to the connector.
+        return False if verify is False else None
+
+    @staticmethod
+    def _client_timeout(timeout) -> aiohttp.ClientTimeout:
+        if timeout is None or isinstance(timeout, aiohttp.ClientTimeout):
+            return timeout
+        return aiohttp.ClientTimeout(total=timeout)
+
+    def _timeout(self, timeout=None) -> tuple:
+        """
+        Returns ``(timeout, limited)``: ``timeout`` of a request, or the default :attr:`timeout`, shortened to the rest
+        of the current deadline, and whether it is the caller's budget rather than the default that limits it.
+        """
+        # Always explicit, because aiohttp takes timeout=None as no timeout at all.
+        limited = timeout is not None
+        timeout = self._client_timeout(timeout) or self.timeout
+        left = remaining()
+        if left is None:
+            return timeout, limited
+        if left <= 0:
+            raise DeadlineExceeded
+        if timeout.total is not None and timeout.total <= left:
+            return timeout, limited
+        return aiohttp.ClientTimeout(total=left, connect=timeout.connect, sock_read=timeout.sock_read,
+                                     sock_connect=timeout.sock_connect), True
+
+    @staticmethod
+    async def _acquire(limiter):
+        try:
+            await wait(limiter.acquire())
+        except asyncio.TimeoutError:
+            raise DeadlineExceeded from None
+
+    @staticmethod
+    def _overlay(headers):
+        """
+        Per-request headers as a read-only mapping the session adds to its own headers. The caller's mapping is never
+        modified, and a multidict proxy is used as is.
+        """
+        if not headers or isinstance(headers, (MultiDictProxy, MultiDict)):
+            return headers or None
+        return CIMultiDictProxy(CIMultiDict(headers))
+
+    async def offload(self, func, arg, size: int, threshold: int = None, thread_only: bool = False):
+        """
+        Runs ``func(arg)`` in the executor if one is set and ``size`` reaches ``threshold`` (defaults to
+        :attr:`offload_threshold` bytes), inline otherwise, and records the time spent in each mode.
+        ``thread_only`` work, e.g. anything that can not be pickled, always runs inline with a process pool.
+        """
+        if threshold is None:
+            threshold = self.offload_threshold
+        offload = self.executor is not None and size >= threshold and \
+            not (thread_only and isinstance(self.executor, ProcessPoolExecutor))
+        started = time.perf_counter()
+        try:
+            if offload:
+                return await asyncio.get_event_loop().run_in_executor(self.executor, func, arg)
+            return func(arg)
+        finally:
+            stats = self.offload_stats["executor" if offload else "inline"]
+            stats["calls"] += 1
+            stats["seconds"] += time.perf_counter() - started
 
-    async def _proc_resp(self, response):
-        if self.return_json:
+    async def _proc_resp(self, response, decoder=None):
+        if decoder is not None or self.return_json:
+            raw = await response.read()
             try:
-                return await response.json()
+                return await self.offload(decoder or self.json_loads, raw, len(raw))
             except Exception:
-                print(traceback.format_exc())
-                print(response)
+                log.exception(f"Could not decode response of {response.method} {response.url} ({response.status})")
                 return {}
         else:
             return await response.text()
 
-    async def get(self, url, params=None, headers=None, verify=True):
-        headers = headers or {}
-        headers.update(self.headers)
-        async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(verify_ssl=verify)) as session:
-            async with session.get(url, params=params, headers=headers) as resp:
-                return await self._proc_resp(resp)
-
-    async def delete(self, url, params=None, headers=None, verify=True):
-        headers = headers or {}
-        headers.update(self.headers)
-        async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(verify_ssl=verify)) as session:
-            async with session.delete(url, params=params, headers=headers) as resp:
-                return await self._proc_resp(resp)
-
-    async def post(self, url, data=None, json=None, headers=None, verify=True):
-        headers = headers or {}
-        headers.update(self.headers)
-        async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(verify_ssl=verify)) as session:
-            if json is not None:
-                async with session.post(url, json=json, headers=headers) as resp:
-                    return await self._proc_resp(resp)
+    @staticmethod
+    def _received(response) -> tuple:
+        if response is None:
+            return None, 0
+        return response.status, response.content.total_bytes
+
+    async def _retry_after(self, response) -> float:
+        retry_after = response.headers.get("Retry-After")
+        if retry_after is None:
+            try:
+                retry_after = (await response.json()).get("retry-after")
+            except Exception:
+                pass
+        try:
+            return float(retry_after)
+        except (TypeError, ValueError):
+            return 1.0
+
+    async def _send(self, method, url, bucket, verify, decoder=None, timeout=None, **kwargs):
+        route = bucket or "global"
+        limiter = self.ratelimiter.bucket(route) if self.ratelimiter is not None else None
+        metrics = self.metrics
+        retry_after = 0.0
+        for _ in range(self.max_ratelimit_retries + 1):
+            if limiter is not None:
+                await self._acquire(limiter)
+            request_timeout, limited = self._timeout(timeout)
+            started = metrics.request_started(route, method, url) if metrics is not None else None
+            resp = error = None
+            try:
+                async with self.session.request(method, url, ssl=self._ssl(verify), timeout=request_timeout,
+                                                **kwargs) as resp:
+                    if limiter is not None:
+                        limiter.update(resp.headers)
+                    if resp.status in self.retry.statuses:
+                        return resp.status, await resp.text()
+                    if resp.status != 429:
+                        return resp.status, await self._proc_resp(resp, decoder)
+                    retry_after = await self._retry_after(resp)
+            except BaseException as e:
+                error = e
+                if limited and isinstance(e, asyncio.TimeoutError):
+                    error = DeadlineExceeded()
+                    raise error from e
+                raise
+            finally:
+                if metrics is not None:
+                    metrics.request_finished(route, method, url, started, *self._received(resp), error)
+            log.warning(f"Rate limited on {method} {url}, retrying in {retry_after:.1f}s")
+            if metrics is not None:
+                metrics.retry(route)
+            if limiter is not None:
+                limiter.block(retry_after)
             else:
-                async with session.post(url, data=data, headers=headers) as resp:
-                    return await self._proc_resp(resp)
+                left = remaining()
+                if left is not None and left < retry_after:
+                    break
+                await asyncio.sleep(retry_after)
+        raise RateLimited(retry_after)
+
+    async def _request(self, method, url, bucket=None, verify=None, decoder=None, **kwargs):
+        breaker = self.breaker
+        trial = breaker.check() if breaker is not None else False
+        attempt = 0
+        try:
+            while True:
+                attempt += 1
+                try:
+                    status, result = await self._send(method, url, bucket, verify, decoder, **kwargs)
+                except DeadlineExceeded:
+                    # The caller ran out of time; DBL did not fail.
+                    raise
+                except self.retry.exceptions as e:
+                    error = e
+                else:
+                    if status not in self.retry.statuses:
+                        if breaker is not None:
+                            breaker.record_success()
+                        return result
+                    error = HTTPException(status, result)
+                if breaker is not None:
+                    breaker.record_failure()
+                if attempt >= self.retry.max_attempts or (breaker is not None and breaker.state != "closed"):
+                    raise error
+                delay = self.retry.delay(attempt)
+                left = remaining()
+                if left is not None and left < delay:
+                    # The retry could not finish before the deadline.
+                    raise error
+                if self.metrics is not None:
+                    self.metrics.retry(bucket or "global")
+                log.warning(f"{method} {url} failed ({error!r}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+        finally:
+            if trial:
+                breaker.release()
+
+    async def get(self, url, params=None, headers=None, verify=None, bucket=None, decoder=None, timeout=None):
+        """
+        ``decoder`` is called with the raw response body as :class:`bytes` instead of the JSON decoder.
+        ``timeout`` (seconds or :class:`aiohttp.ClientTimeout`) applies to every attempt, in place of the session's.
+        """
+        headers = self._overlay(headers)
+        return await self._request("GET", url, bucket, verify, decoder, params=params, headers=headers,
+                                   timeout=timeout)
+
+    async def stream(self, url, parser, params=None, headers=None, verify=None, bucket=None,
+                     chunk_size: int = 65536, time_slice: float = 0.005, timeout=None):
+        """
+        Async generator for large GET responses. Reads the body in chunks of ``chunk_size`` bytes, feeds them to
+        ``parser`` (see :mod:`dblapi.decoders`) and yields parsed items as they arrive, instead of buffering and
+        decoding the whole body at once. Whenever parsing has used more than ``time_slice`` seconds since
+        control was last handed back to the event loop, it is handed back again.
+
+        Streamed requests are rate limited and count towards the circuit breaker, but are not retried.
+        """
+        headers = self._overlay(headers)
+        route = bucket or "global"
+        breaker = self.breaker
+        trial = breaker.check() if breaker is not None else False
+        limiter = self.ratelimiter.bucket(route) if self.ratelimiter is not None else None
+        metrics = self.metrics
+        request_started_at = resp = error = None
+        limited = False
+        try:
+            if limiter is not None:
+                await self._acquire(limiter)
+            timeout, limited = self._timeout(timeout)
+            if metrics is not None:
+                request_started_at = metrics.request_started(route, "GET", url)
+            async with self.session.get(url, params=params, headers=headers, ssl=self._ssl(verify),
+                                        timeout=timeout) as resp:
+                if limiter is not None:
+                    limiter.update(resp.headers)
+                if resp.status == 429:
+                    retry_after = await self._retry_after(resp)
+                    if limiter is not None:
+                        limiter.block(retry_after)
+                    raise RateLimited(retry_after)
+                if resp.status >= 400:
+                    if breaker is not None and resp.status in self.retry.statuses:
+                        breaker.record_failure()
+                    raise HTTPException(resp.status, await resp.text())
+                busy = 0.0
+                async for chunk in resp.content.iter_chunked(chunk_size):
+                    started = time.perf_counter()
+                    items = parser.feed(chunk)
+                    busy += time.perf_counter() - started
+                    for item in items:
+                        yield item
+                    if busy > time_slice:
+                        await asyncio.sleep(0)
+                        busy = 0.0
+                for item in parser.close():
+                    yield item
+            if breaker is not None:
+                breaker.record_success()
+        except BaseException as e:
+            if not isinstance(e, GeneratorExit):
+                error = e
+            if limited and isinstance(e, asyncio.TimeoutError) and not isinstance(e, DeadlineExceeded):
+                error = DeadlineExceeded()
+                raise error from e
+            if breaker is not None and isinstance(e, self.retry.exceptions) and not isinstance(e, DeadlineExceeded):
+                breaker.record_failure()
+            raise
+        finally:
+            if trial:
+                breaker.release()
+            if metrics is not None and request_started_at is not None:
+                metrics.request_finished(route, "GET", url, request_started_at, *self._received(resp), error)
+
+    async def delete(self, url, params=None, headers=None, verify=None, bucket=None, timeout=None):
+        headers = self._overlay(headers)
+        return await self._request("DELETE", url, bucket, verify, params=params, headers=headers, timeout=timeout)
+
+    async def post(self, url, data=None, json=None, headers=None, verify=None, bucket=None, timeout=None):
+        headers = self._overlay(headers)
+        if json is not None:
+            return await self._request("POST", url, bucket, verify, json=json, headers=headers, timeout=timeout)
+        else:
+            return await self._request("POST", url, bucket, verify, data=data, headers=headers, timeout=timeout)
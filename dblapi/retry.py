@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+
+# The MIT License (MIT)
+# Copyright (c) 2018 AndyTempel
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+# OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+import asyncio
+import random
+import time
+
+import aiohttp
+
+from .errors import CircuitOpen
+
+RETRY_STATUSES = frozenset({500, 502, 503, 504, 520, 522, 524})
+RETRY_EXCEPTIONS = (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError, asyncio.TimeoutError)
+
+
+class RetryPolicy:
+    """
+    Decides which failed requests are retried and how long to wait in between. A request is tried at most
+    ``max_attempts`` times; the n-th retry waits a random time up to ``backoff * 2 ** (n - 1)`` seconds,
+    capped at ``max_backoff``.
+    """
+
+    def __init__(self, max_attempts: int = 3, backoff: float = 0.5, max_backoff: float = 10.0,
+                 statuses=RETRY_STATUSES, exceptions=RETRY_EXCEPTIONS):
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.statuses = frozenset(statuses)
+        self.exceptions = tuple(exceptions)
+
+    def delay(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** (attempt - 1)))
+
+
+class CircuitBreaker:
+    """
+    Fails requests fast while DBL is down. After ``failure_threshold`` consecutive failures the circuit
+    opens and requests raise :class:`dblapi.errors.CircuitOpen` without touching the network. After
+    ``reset_timeout`` seconds a single trial request is let through: success closes the circuit again,
+    failure keeps it open for another ``reset_timeout``.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._trial = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at < self.reset_timeout:
+            return "open"
+        return "half-open"
+
+    def check(self) -> bool:
+        """
+        Raises :class:`dblapi.errors.CircuitOpen` if a request may not be sent right now.
+        Returns True if the request is let through as the trial request.
+        """
+        state = self.state
+        if state == "open" or (state == "half-open" and self._trial):
+            retry_in = max(0.0, self.opened_at + self.reset_timeout - time.monotonic())
+            raise CircuitOpen(retry_in)
+        if state == "half-open":
+            self._trial = True
+            return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self._trial = False
+
+    def release(self):
+        """Lets another trial request through if the current one ended without a result, e.g. was cancelled."""
+        self._trial = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self._trial or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+            self._trial = False
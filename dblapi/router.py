@@ -18,14 +18,29 @@
 # FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
 # DEALINGS IN THE SOFTWARE.
 
+from functools import lru_cache
+
+from yarl import URL
+
 from .errors import RequireFormatting
 
 
 class Route(object):
-    def __init__(self, url: str, method: str, require_format: bool = False):
+    """
+    URL template of an API route. Calling the route with the template's arguments returns the request URL as
+    :class:`yarl.URL`; the template is split once, and the last ``cache_size`` URLs are kept, so that frequent
+    requests neither format nor parse their URL again.
+    """
+
+    def __init__(self, url: str, method: str, require_format: bool = False, cache_size: int = 256):
         self.url = url
         self.method = method
         self.require_format = require_format
+        # Rate-limit bucket key shared by every URL formatted from this route.
+        self.bucket = f"{method} {url}"
+        self._parts = url.split("{}")
+        self._url = None if require_format else URL(url)
+        self._cached_url = lru_cache(maxsize=cache_size)(self._make_url)
 
     def __str__(self) -> str:
         if self.require_format:
@@ -37,12 +52,25 @@ class Route(object):
             raise RequireFormatting
         return self.url
 
+    def __call__(self, *args) -> URL:
+        if self._url is not None:
+            return self._url
+        return self._cached_url(*args)
+
+    def _make_url(self, *args) -> URL:
+        return URL(self.format_url(*args))
+
     def format_url(self, *args) -> str:
-        return self.url.format(*args)
+        if len(args) != len(self._parts) - 1:
+            raise RequireFormatting
+        parts = self._parts
+        return parts[0] + "".join(str(arg) + part for arg, part in zip(args, parts[1:]))
 
 
 class Router(object):
-    def __init__(self, base_url: str):
+    """Route table of the DBL API. Every route is a :class:`Route` that keeps up to ``cache_size`` URLs."""
+
+    def __init__(self, base_url: str, cache_size: int = 256):
         if not base_url.endswith("/"):
             base_url += "/"
         self.base_url = base_url
@@ -51,13 +79,13 @@ class Router(object):
         self.base_wig = base_url + "widget/"
 
         self.bot_search = Route(self.base_bot, "GET")
-        self.bot_get = Route(self.base_bot + "/{}", "GET", True)
-        self.bot_votes = Route(self.base_bot + "/{}/votes", "GET", True)
-        self.bot_stats = Route(self.base_bot + "/{}/stats", "GET", True)
-        self.bot_ul_stats = Route(self.base_bot + "{}/stats", "POST", True)
+        self.bot_get = Route(self.base_bot + "/{}", "GET", True, cache_size)
+        self.bot_votes = Route(self.base_bot + "/{}/votes", "GET", True, cache_size)
+        self.bot_stats = Route(self.base_bot + "/{}/stats", "GET", True, cache_size)
+        self.bot_ul_stats = Route(self.base_bot + "/{}/stats", "POST", True, cache_size)
 
-        self.user_get = Route(self.base_usr + "{}", "GET", True)
+        self.user_get = Route(self.base_usr + "{}", "GET", True, cache_size)
 
-        self.widget_get = Route(self.base_wig + "{}.svg", "GET", True)
-        self.widget_owner = Route(self.base_wig + "owner/{}.svg", "GET", True)
+        self.widget_get = Route(self.base_wig + "{}.svg", "GET", True, cache_size)
+        self.widget_owner = Route(self.base_wig + "owner/{}.svg", "GET", True, cache_size)
 
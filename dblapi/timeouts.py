@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+
+# The MIT License (MIT)
+# Copyright (c) 2018 AndyTempel
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+# OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+import asyncio
+import contextvars
+import time
+from contextlib import contextmanager
+
+_deadline = contextvars.ContextVar("dblapi_deadline", default=None)
+
+
+class DeadlineExceeded(asyncio.TimeoutError):
+    """
+    Raised when the caller's time budget, a :func:`dblapi.deadline` or a per-request timeout, runs out. Unlike other
+    timeouts it is not retried and does not count as a DBL failure.
+    """
+
+    def __init__(self):
+        super().__init__("Deadline exceeded")
+
+
+@contextmanager
+def deadline(seconds: float):
+    """
+    Limits every API call made in the ``with`` block, including retries and waits on cached results, to finish
+    within ``seconds`` from now. Calls that would run past it raise :class:`asyncio.TimeoutError`. A nested
+    deadline can only shorten the one around it.
+
+    .. code-block:: python
+
+        with dblapi.deadline(2.5):
+            voted = await client.has_user_voted(ctx.author)
+    """
+    expires = time.monotonic() + seconds
+    current = _deadline.get()
+    if current is not None:
+        expires = min(expires, current)
+    token = _deadline.set(expires)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining(timeout: float = None) -> float:
+    """Seconds left of ``timeout`` and the current deadline, whichever ends first. None if there is neither."""
+    expires = _deadline.get()
+    if expires is None:
+        return timeout
+    left = max(0.0, expires - time.monotonic())
+    return left if timeout is None else min(timeout, left)
+
+
+def clear_deadline():
+    """
+    Removes the deadline from the current context. Called by work shared between callers, e.g. cache refreshes,
+    which are not limited by the deadline of the caller that happened to start them.
+    """
+    _deadline.set(None)
+
+
+async def wait(awaitable, timeout: float = None):
+    """|coro|
+
+    Awaits ``awaitable`` for at most ``timeout`` seconds and the rest of the current deadline.
+    """
+    timeout = remaining(timeout)
+    if timeout is None:
+        return await awaitable
+    return await asyncio.wait_for(awaitable, timeout)
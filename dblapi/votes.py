@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+
+# The MIT License (MIT)
+# Copyright (c) 2018 AndyTempel
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+# OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+import time
+from bisect import bisect_left, insort
+
+
+class VoteStore:
+    """
+    Keeps the time of the latest known vote of every user that voted within the last ``window`` seconds.
+
+    Votes arrive from two sources. Webhook votes are added with :meth:`add` and carry their time. Polled
+    vote lists are merged with :meth:`reconcile`; users first seen in a later poll are timed at that poll,
+    while users already listed by the very first poll have an unknown vote time and only count as voted
+    for checks over the whole window.
+
+    Votes are also kept in a time-ordered log, so expiring old votes and :meth:`votes_since` only touch
+    the affected entries instead of reloading everything.
+    """
+
+    UNKNOWN = 0.0
+
+    def __init__(self, window: float):
+        self.window = window
+        self._latest = {}
+        self._log = []
+        self._reconciled = False
+
+    def __contains__(self, user: int) -> bool:
+        return self.has_voted(user)
+
+    def __iter__(self):
+        return iter(self._latest)
+
+    def __len__(self) -> int:
+        return len(self._latest)
+
+    @property
+    def users(self):
+        """Set-like view of all user IDs in the store."""
+        return self._latest.keys()
+
+    def add(self, user: int, timestamp: float = None):
+        """Records a vote of ``user`` at ``timestamp`` (epoch seconds, defaults to now)."""
+        if timestamp is None:
+            timestamp = time.time()
+        if timestamp <= self._latest.get(user, -1.0):
+            return
+        self._latest[user] = timestamp
+        entry = (timestamp, user)
+        if not self._log or entry >= self._log[-1]:
+            self._log.append(entry)
+        else:
+            insort(self._log, entry)
+
+    def reconcile(self, users):
+        """Merges a polled set of user IDs. Returns the store itself, so it can be used as a :class:`Cacher` merge."""
+        now = time.time()
+        for user in users:
+            if user not in self._latest:
+                if self._reconciled:
+                    self.add(user, now)
+                else:
+                    self._latest[user] = self.UNKNOWN
+        # Users without a known vote time are only vouched for by the poll.
+        for user in [user for user, ts in self._latest.items() if ts == self.UNKNOWN and user not in users]:
+            del self._latest[user]
+        self._reconciled = True
+        self.expire(now)
+        return self
+
+    def expire(self, now: float = None):
+        """Drops votes that are older than the window."""
+        cutoff = (time.time() if now is None else now) - self.window
+        index = bisect_left(self._log, (cutoff,))
+        if not index:
+            return
+        for timestamp, user in self._log[:index]:
+            if self._latest.get(user) == timestamp:
+                del self._latest[user]
+        del self._log[:index]
+
+    def has_voted(self, user: int, within: float = None) -> bool:
+        """Returns True if ``user`` voted within the last ``within`` seconds (defaults to the whole window)."""
+        timestamp = self._latest.get(user)
+        if timestamp is None:
+            return False
+        if within is None or within >= self.window:
+            return timestamp == self.UNKNOWN or timestamp >= time.time() - self.window
+        return timestamp >= time.time() - within
+
+    def votes_since(self, timestamp: float):
+        """Yields IDs of users whose latest vote was at or after ``timestamp`` (epoch seconds), oldest first."""
+        index = bisect_left(self._log, (timestamp,))
+        for entry in self._log[index:]:
+            if self._latest.get(entry[1]) == entry[0]:
+                yield entry[1]
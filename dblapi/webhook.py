@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+
+# The MIT License (MIT)
+# Copyright (c) 2018 AndyTempel
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+# OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+import hmac
+import logging
+
+from aiohttp import web
+
+from .errors import InvalidArgument
+
+log = logging.getLogger(__name__)
+
+
+class WebhookServer:
+    """
+    Small aiohttp server receiving DBL vote webhooks. Set the webhook URL on your bot's DBL edit page to
+    ``http://<host>:<port><path>`` and the authorization to ``auth``.
+
+    Every accepted vote is passed to ``on_vote`` with the webhook payload as :class:`dict`. To try it locally,
+    post a vote yourself::
+
+        curl -X POST -H "Authorization: <auth>" -d '{"bot": "1", "user": "2", "type": "test"}' \\
+            http://127.0.0.1:5000/dblwebhook
+
+    Parameters
+    -------------
+    on_vote: callable
+        Called with the payload of every authorized vote.
+    path: :class:`str`
+        URL path the server listens on.
+    auth: :class:`str`
+        Expected value of the ``Authorization`` header. Required, since anyone who can reach the server could
+        add votes otherwise.
+    host: :class:`str`
+        Interface to bind to.
+    port: :class:`int`
+        Port to bind to.
+    """
+
+    def __init__(self, on_vote, path: str = "/dblwebhook", auth: str = None, host: str = "0.0.0.0",
+                 port: int = 5000):
+        if not auth:
+            raise InvalidArgument("auth is required")
+        self.on_vote = on_vote
+        self.path = path
+        self.auth = auth
+        self.host = host
+        self.port = port
+        self._runner = None
+
+        self.app = web.Application()
+        self.app.router.add_post(self.path, self.handle_vote)
+
+    async def handle_vote(self, request: web.Request) -> web.Response:
+        if not hmac.compare_digest(request.headers.get("Authorization", "").encode(), self.auth.encode()):
+            log.warning(f"Rejected vote webhook with bad authorization from {request.remote}")
+            return web.Response(status=401)
+        try:
+            data = await request.json()
+            int(data["user"])
+        except (ValueError, KeyError, TypeError):
+            return web.Response(status=400)
+        self.on_vote(data)
+        return web.Response(status=200)
+
+    async def start(self):
+        """|coro|
+
+        Starts listening for webhooks.
+        """
+        if self._runner is not None:
+            return
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        log.info(f"Listening for DBL vote webhooks on {self.host}:{self.port}{self.path}")
+
+    async def stop(self):
+        """|coro|
+
+        Stops the server.
+        """
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None